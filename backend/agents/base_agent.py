@@ -6,12 +6,17 @@ Provides the foundation for all specialized AI agents with MCP integration.
 
 import asyncio
 import logging
+import os
 from abc import ABC, abstractmethod
 from typing import Dict, Any, Optional, List
 from dataclasses import dataclass
 from datetime import datetime
 
 from core.mcp_manager import MCPManager
+from core.rate_limiter import PRIORITY_INTERACTIVE
+
+# Shared deadline (seconds) for a handler's concurrent MCP lookups
+LOOKUP_DEADLINE = float(os.getenv("AGENT_LOOKUP_DEADLINE", "10.0"))
 
 @dataclass
 class AgentResponse:
@@ -29,7 +34,7 @@ class TaskContext:
     """Context information for agent tasks"""
     user_id: str
     task_id: str
-    priority: int = 1
+    priority: int = PRIORITY_INTERACTIVE  # lower is more urgent; see core.rate_limiter
     metadata: Optional[Dict[str, Any]] = None
 
 class BaseAgent(ABC):
@@ -48,8 +53,8 @@ class BaseAgent(ABC):
         try:
             self.logger.info(f"Initializing agent: {self.name}")
 
-            # Connect to required MCP servers
-            connection_results = await self.mcp_manager.connect_all()
+            # Wait for the shared, once-per-process MCP connection attempt
+            connection_results = await self.mcp_manager.ensure_connected()
 
             # Check if all required servers are connected
             required_servers = self.get_required_mcp_servers()
@@ -124,14 +129,84 @@ class BaseAgent(ABC):
                 timestamp=datetime.now()
             )
 
-    async def query_mcp_servers(self, query: str, server_names: Optional[List[str]] = None) -> Dict[str, Any]:
-        """Query MCP servers for information"""
+    async def query_mcp_servers(
+        self,
+        query: str,
+        server_names: Optional[List[str]] = None,
+        context: Optional[TaskContext] = None
+    ) -> Dict[str, Any]:
+        """Query MCP servers for information, scheduled at the task's priority"""
+        priority = context.priority if context else PRIORITY_INTERACTIVE
+        user_id = context.user_id if context else None
+
         if server_names:
-            return await self.mcp_manager.query_multiple(server_names, query)
+            return await self.mcp_manager.query_multiple(server_names, query, priority=priority, user_id=user_id)
         else:
             # Query all available servers
             required_servers = self.get_required_mcp_servers()
-            return await self.mcp_manager.query_multiple(required_servers, query)
+            return await self.mcp_manager.query_multiple(required_servers, query, priority=priority, user_id=user_id)
+
+    async def gather_mcp_lookups(
+        self,
+        lookups: Dict[str, str],
+        context: Optional[TaskContext] = None,
+        deadline: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """Run independent lookups ({server name: query}) concurrently under one shared deadline.
+
+        Lookups still pending at the deadline are reported as
+        {"error": ..., "timed_out": True} so the caller can answer with the data
+        that did arrive. Their upstream requests keep running behind the response
+        cache, so a later identical lookup is likely to be a cache hit.
+
+        Only for cacheable, idempotent servers: a late lookup is cancelled, and
+        on a transactional server (e.g. irs_ein) that would cancel the filing
+        itself, so those raise ValueError and must be queried directly.
+        """
+        if not lookups:
+            return {}
+
+        transactional = [
+            server_name for server_name in lookups
+            if server_name in self.mcp_manager.connections and not self.mcp_manager.is_shared(server_name)
+        ]
+        if transactional:
+            raise ValueError(f"gather_mcp_lookups is for cacheable servers only, not {transactional}")
+
+        deadline = LOOKUP_DEADLINE if deadline is None else deadline
+        priority = context.priority if context else PRIORITY_INTERACTIVE
+        user_id = context.user_id if context else None
+
+        tasks = {
+            server_name: asyncio.create_task(
+                self.mcp_manager.query_server(server_name, query, priority=priority, user_id=user_id)
+            )
+            for server_name, query in lookups.items()
+        }
+        try:
+            _, pending = await asyncio.wait(tasks.values(), timeout=deadline)
+        finally:
+            for task in tasks.values():
+                task.cancel()
+
+        results = {}
+        for server_name, task in tasks.items():
+            if task in pending:
+                results[server_name] = {"error": f"No answer from {server_name} within {deadline}s", "timed_out": True}
+            elif task.exception() is not None:
+                results[server_name] = {"error": str(task.exception())}
+            else:
+                results[server_name] = task.result()
+
+        if pending:
+            timed_out = [name for name, result in results.items() if result.get("timed_out")]
+            self.logger.info(f"Lookup deadline ({deadline}s) reached, answering without: {timed_out}")
+        return results
+
+    @staticmethod
+    def answered_sources(results: Dict[str, Any]) -> List[str]:
+        """Servers in gather_mcp_lookups results that answered before the deadline"""
+        return [name for name, result in results.items() if not result.get("timed_out")]
 
     def get_status(self) -> Dict[str, Any]:
         """Get agent status and health information"""
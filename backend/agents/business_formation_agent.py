@@ -11,6 +11,46 @@ from typing import Dict, Any, List, Optional
 from datetime import datetime
 
 from .base_agent import BaseAgent, TaskContext, AgentResponse
+from .intent_router import IntentRouter
+
+# How a task is read: the handler it is routed to, the business it describes
+# and its risk factors, all in one pass over the task text
+INTENT_ROUTER = IntentRouter(
+    {
+        "route": [
+            ("registration", ["register", "incorporate", "form", "start"]),
+            ("license", ["license", "permit", "certification"]),
+            ("tax", ["tax", "taxes", "ein", "federal tax"]),
+            ("structure", ["structure", "llc", "corporation", "partnership"]),
+            ("compliance", ["compliance", "requirements", "regulations"])
+        ],
+        "business_type": [
+            ("LLC", ["llc", "limited liability"]),
+            ("Corporation", ["corporation", "corp", "inc"]),
+            ("Partnership", ["partnership", "llp"]),
+            ("Nonprofit", ["nonprofit", "501c3"])
+        ],
+        "industry": [
+            (industry, [industry]) for industry in [
+                "technology", "software", "consulting", "retail", "restaurant",
+                "healthcare", "manufacturing", "real estate", "professional services"
+            ]
+        ],
+        "liability_concerns": [("high", ["high risk"])],
+        "growth_plans": [("aggressive", ["scale", "grow", "expand"])],
+        "ownership_structure": [("multiple", ["partners", "multiple owners"])],
+        "industry_risk": [("high", ["healthcare", "construction", "manufacturing"])]
+    },
+    defaults={
+        "route": "general",
+        "business_type": "LLC",  # Default recommendation
+        "industry": "general business",
+        "liability_concerns": "medium",
+        "growth_plans": "moderate",
+        "ownership_structure": "single",
+        "industry_risk": "low"
+    }
+)
 
 class BusinessFormationAgent(BaseAgent):
     """AI agent specialized in business formation and Washington State compliance"""
@@ -36,45 +76,35 @@ class BusinessFormationAgent(BaseAgent):
     async def process_task(self, task: str, context: TaskContext) -> Dict[str, Any]:
         """Process business formation related tasks"""
 
-        task_lower = task.lower()
+        intent = INTENT_ROUTER.classify(task)
 
         # Route to appropriate handler based on task content
-        if any(keyword in task_lower for keyword in ["register", "incorporate", "form", "start"]):
-            return await self._handle_business_registration(task, context)
-        elif any(keyword in task_lower for keyword in ["license", "permit", "certification"]):
-            return await self._handle_license_requirements(task, context)
-        elif any(keyword in task_lower for keyword in ["tax", "taxes", "ein", "federal tax"]):
-            return await self._handle_tax_setup(task, context)
-        elif any(keyword in task_lower for keyword in ["structure", "llc", "corporation", "partnership"]):
-            return await self._handle_business_structure(task, context)
-        elif any(keyword in task_lower for keyword in ["compliance", "requirements", "regulations"]):
-            return await self._handle_compliance_check(task, context)
-        else:
-            return await self._handle_general_inquiry(task, context)
-
-    async def _handle_business_registration(self, task: str, context: TaskContext) -> Dict[str, Any]:
-        """Handle business registration tasks"""
+        handlers = {
+            "registration": self._handle_business_registration,
+            "license": self._handle_license_requirements,
+            "tax": self._handle_tax_setup,
+            "structure": self._handle_business_structure,
+            "compliance": self._handle_compliance_check,
+            "general": self._handle_general_inquiry
+        }
+        return await handlers[intent["route"]](task, context, intent)
 
-        # Query Washington State SOS for current registration info
-        sos_data = await self.query_mcp_servers(
-            "business registration requirements Washington state",
-            ["wa_sos"]
-        )
+    async def _handle_business_registration(self, task: str, context: TaskContext, intent: Dict[str, Any]) -> Dict[str, Any]:
+        """Handle business registration tasks"""
 
-        # Query DOR for tax registration requirements
-        dor_data = await self.query_mcp_servers(
-            "business tax registration requirements Washington state",
-            ["wa_dor"]
-        )
+        # SOS registration info and DOR tax registration requirements, looked up concurrently
+        lookups = await self.gather_mcp_lookups({
+            "wa_sos": "business registration requirements Washington state",
+            "wa_dor": "business tax registration requirements Washington state"
+        }, context)
 
-        # Analyze business type from task
-        business_type = self._extract_business_type(task)
+        business_type = intent["business_type"]
 
         response_data = {
             "business_type": business_type,
             "registration_steps": self._get_registration_steps(business_type),
-            "wa_sos_info": sos_data.get("wa_sos", {}),
-            "wa_dor_info": dor_data.get("wa_dor", {}),
+            "wa_sos_info": lookups["wa_sos"],
+            "wa_dor_info": lookups["wa_dor"],
             "estimated_timeline": "2-4 weeks",
             "estimated_cost": "$200-500",
             "required_documents": self._get_required_documents(business_type)
@@ -84,19 +114,19 @@ class BusinessFormationAgent(BaseAgent):
             "success": True,
             "data": response_data,
             "message": f"Business registration guidance for {business_type} in Washington State",
-            "mcp_sources": ["wa_sos", "wa_dor"]
+            "mcp_sources": self.answered_sources(lookups)
         }
 
-    async def _handle_license_requirements(self, task: str, context: TaskContext) -> Dict[str, Any]:
+    async def _handle_license_requirements(self, task: str, context: TaskContext, intent: Dict[str, Any]) -> Dict[str, Any]:
         """Handle license and permit requirements"""
 
-        # Extract business type and industry
-        business_info = self._extract_business_info(task)
+        business_info = {"type": intent["business_type"], "industry": intent["industry"]}
 
         # Query relevant servers for license requirements
-        license_data = await self.query_mcp_servers(
-            f"business license requirements for {business_info.get('industry', 'general business')} in Washington state",
-            ["wa_sos", "legal_us"]
+        license_query = f"business license requirements for {business_info.get('industry', 'general business')} in Washington state"
+        license_data = await self.gather_mcp_lookups(
+            {"wa_sos": license_query, "legal_us": license_query},
+            context
         )
 
         response_data = {
@@ -112,16 +142,16 @@ class BusinessFormationAgent(BaseAgent):
             "success": True,
             "data": response_data,
             "message": f"License requirements for {business_info.get('industry', 'your business')} in Washington State",
-            "mcp_sources": ["wa_sos", "legal_us"]
+            "mcp_sources": self.answered_sources(license_data)
         }
 
-    async def _handle_tax_setup(self, task: str, context: TaskContext) -> Dict[str, Any]:
+    async def _handle_tax_setup(self, task: str, context: TaskContext, intent: Dict[str, Any]) -> Dict[str, Any]:
         """Handle tax setup and registration"""
 
         # Query DOR for tax requirements
-        tax_data = await self.query_mcp_servers(
-            "business tax setup requirements Washington state",
-            ["wa_dor"]
+        tax_data = await self.gather_mcp_lookups(
+            {"wa_dor": "business tax setup requirements Washington state"},
+            context
         )
 
         response_data = {
@@ -145,14 +175,14 @@ class BusinessFormationAgent(BaseAgent):
             "success": True,
             "data": response_data,
             "message": "Tax setup guidance for Washington State businesses",
-            "mcp_sources": ["wa_dor"]
+            "mcp_sources": self.answered_sources(tax_data)
         }
 
-    async def _handle_business_structure(self, task: str, context: TaskContext) -> Dict[str, Any]:
+    async def _handle_business_structure(self, task: str, context: TaskContext, intent: Dict[str, Any]) -> Dict[str, Any]:
         """Handle business structure recommendations"""
 
-        # Analyze task for business characteristics
-        business_characteristics = self._analyze_business_characteristics(task)
+        # Business characteristics relevant to the choice of structure
+        business_characteristics = self._get_business_characteristics(intent)
 
         # Get structure recommendations
         recommendations = self._get_structure_recommendations(business_characteristics)
@@ -171,13 +201,14 @@ class BusinessFormationAgent(BaseAgent):
             "mcp_sources": ["legal_us"]
         }
 
-    async def _handle_compliance_check(self, task: str, context: TaskContext) -> Dict[str, Any]:
+    async def _handle_compliance_check(self, task: str, context: TaskContext, intent: Dict[str, Any]) -> Dict[str, Any]:
         """Handle compliance checking tasks"""
 
         # Query multiple sources for compliance requirements
-        compliance_data = await self.query_mcp_servers(
-            "business compliance requirements Washington state",
-            ["wa_sos", "wa_dor", "legal_us"]
+        compliance_query = "business compliance requirements Washington state"
+        compliance_data = await self.gather_mcp_lookups(
+            {server: compliance_query for server in ["wa_sos", "wa_dor", "legal_us"]},
+            context
         )
 
         response_data = {
@@ -198,21 +229,22 @@ class BusinessFormationAgent(BaseAgent):
             "success": True,
             "data": response_data,
             "message": "Washington State business compliance requirements",
-            "mcp_sources": ["wa_sos", "wa_dor", "legal_us"]
+            "mcp_sources": self.answered_sources(compliance_data)
         }
 
-    async def _handle_general_inquiry(self, task: str, context: TaskContext) -> Dict[str, Any]:
+    async def _handle_general_inquiry(self, task: str, context: TaskContext, intent: Dict[str, Any]) -> Dict[str, Any]:
         """Handle general business formation inquiries"""
 
         # Query all available sources for general guidance
-        general_data = await self.query_mcp_servers(
-            f"business formation guidance: {task}",
-            ["wa_sos", "wa_dor", "legal_us"]
+        general_query = f"business formation guidance: {task}"
+        general_data = await self.gather_mcp_lookups(
+            {server: general_query for server in ["wa_sos", "wa_dor", "legal_us"]},
+            context
         )
 
         response_data = {
             "inquiry_type": "general",
-            "guidance_sources": list(general_data.keys()),
+            "guidance_sources": self.answered_sources(general_data),
             "recommendation": "Consider consulting with a business attorney or accountant for personalized advice",
             "resources": {
                 "wa_business_licensing": "https://bls.dor.wa.gov/",
@@ -225,54 +257,17 @@ class BusinessFormationAgent(BaseAgent):
             "success": True,
             "data": response_data,
             "message": "General business formation guidance",
-            "mcp_sources": list(general_data.keys())
+            "mcp_sources": self.answered_sources(general_data)
         }
 
-    def _extract_business_type(self, task: str) -> str:
-        """Extract business type from task description"""
-        task_lower = task.lower()
-
-        if any(word in task_lower for word in ["llc", "limited liability"]):
-            return "LLC"
-        elif any(word in task_lower for word in ["corporation", "corp", "inc"]):
-            return "Corporation"
-        elif any(word in task_lower for word in ["partnership", "llp"]):
-            return "Partnership"
-        elif any(word in task_lower for word in ["nonprofit", "501c3"]):
-            return "Nonprofit"
-        else:
-            return "LLC"  # Default recommendation
-
-    def _extract_business_info(self, task: str) -> Dict[str, str]:
-        """Extract business type and industry from task"""
+    def _get_business_characteristics(self, intent: Dict[str, Any]) -> Dict[str, Any]:
+        """Business characteristics for structure recommendations"""
         return {
-            "type": self._extract_business_type(task),
-            "industry": self._extract_industry(task)
-        }
-
-    def _extract_industry(self, task: str) -> str:
-        """Extract industry from task description"""
-        industries = [
-            "technology", "software", "consulting", "retail", "restaurant",
-            "healthcare", "manufacturing", "real estate", "professional services"
-        ]
-
-        task_lower = task.lower()
-        for industry in industries:
-            if industry in task_lower:
-                return industry
-
-        return "general business"
-
-    def _analyze_business_characteristics(self, task: str) -> Dict[str, Any]:
-        """Analyze business characteristics for structure recommendations"""
-        characteristics = {
-            "liability_concerns": "high" if "high risk" in task.lower() else "medium",
-            "growth_plans": "aggressive" if any(word in task.lower() for word in ["scale", "grow", "expand"]) else "moderate",
-            "ownership_structure": "multiple" if any(word in task.lower() for word in ["partners", "multiple owners"]) else "single",
-            "industry_risk": "high" if any(word in task.lower() for word in ["healthcare", "construction", "manufacturing"]) else "low"
+            "liability_concerns": intent["liability_concerns"],
+            "growth_plans": intent["growth_plans"],
+            "ownership_structure": intent["ownership_structure"],
+            "industry_risk": intent["industry_risk"]
         }
-        return characteristics
 
     def _get_registration_steps(self, business_type: str) -> List[str]:
         """Get registration steps for business type"""
@@ -0,0 +1,121 @@
+"""
+Keyword intent router shared by the agents
+
+An agent describes how it reads a task as ordered keyword tables (the route,
+business type, industry, risk flags, ...). IntentRouter compiles every
+keyword of every table into one trie-shaped regular expression, so a task is
+lowercased and scanned once no matter how many tables or keywords there are,
+instead of once per `keyword in task.lower()` test.
+
+Keywords match at the start of a word ("inc" matches "incorporated" and
+"grow" matches "growth"), not in the middle of one ("ein" does not match
+"being" and "form" does not match "platform"). Punctuation counts as a word
+separator, so "non-profit" and "non profit" read the same.
+"""
+
+import re
+import string
+from typing import Dict, FrozenSet, Iterable, List, Optional, Sequence, Set, Tuple
+
+# Every ASCII character that is not a lowercase letter or digit, plus common
+# typographic punctuation, becomes a space before matching
+_SEPARATORS = str.maketrans({
+    char: " "
+    for char in (
+        [chr(code) for code in range(128) if chr(code) not in string.ascii_lowercase + string.digits]
+        + ["\u00a0", "\u2013", "\u2014", "\u2018", "\u2019", "\u201c", "\u201d"]
+    )
+})
+
+KeywordTable = Sequence[Tuple[str, Sequence[str]]]  # (label, keywords), first matching label wins
+
+
+def normalize_text(text: str) -> str:
+    """Lowercased text with separators turned into spaces, with a leading space"""
+    return " " + text.lower().translate(_SEPARATORS)
+
+
+def _trie_pattern(keywords: Iterable[str]) -> str:
+    """Alternation of keywords sharing common prefixes, e.g. 'tax(?:es)?'"""
+    trie: Dict[str, dict] = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: dict) -> str:
+        branches = [
+            (" +" if char == " " else re.escape(char)) + build(child)
+            for char, child in sorted(node.items()) if char
+        ]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" in node:
+            # Optional tails are greedy, so the longest keyword at a position is reported
+            return f"(?:{body})?"
+        return body
+
+    return build(trie)
+
+
+class IntentRouter:
+    """Classifies text against ordered keyword tables in a single pass"""
+
+    def __init__(self, tables: Dict[str, KeywordTable], defaults: Optional[Dict[str, str]] = None):
+        self.defaults: Dict[str, Optional[str]] = {name: None for name in tables}
+        self.defaults.update(defaults or {})
+
+        # keyword -> (table, rank of its label in the table, label) for every label it belongs to
+        labels: Dict[str, List[Tuple[str, int, str]]] = {}
+        for name, table in tables.items():
+            for rank, (label, keywords) in enumerate(table):
+                for keyword in keywords:
+                    labels.setdefault(" ".join(normalize_text(keyword).split()), []).append((name, rank, label))
+
+        # Lookahead at every word start, so overlapping keywords are all seen
+        self._pattern = re.compile(r" (?=(" + _trie_pattern(labels) + "))")
+
+        # A match only reports the longest keyword starting at a word; it also
+        # implies every keyword found at a word start inside it ("taxes" -> "tax",
+        # "federal tax" -> "tax")
+        self._implied: Dict[str, FrozenSet[str]] = {
+            keyword: frozenset(other for other in labels if self._at_word_start(keyword, other))
+            for keyword in labels
+        }
+        self._labels: Dict[str, List[Tuple[str, int, str]]] = {
+            keyword: [entry for other in implied for entry in labels[other]]
+            for keyword, implied in self._implied.items()
+        }
+
+    @staticmethod
+    def _at_word_start(keyword: str, other: str) -> bool:
+        """Whether other occurs in keyword starting at one of its words"""
+        padded = f" {keyword}"
+        return any(padded.startswith(other, position + 1) for position, char in enumerate(padded) if char == " ")
+
+    def _matches(self, text: str) -> Set[str]:
+        """Longest keyword at each word start where one occurs, with single spaces"""
+        return {
+            match if "  " not in match else " ".join(match.split())
+            for match in self._pattern.findall(normalize_text(text))
+        }
+
+    def keywords(self, text: str) -> Set[str]:
+        """Every keyword that occurs in text"""
+        found: Set[str] = set()
+        for match in self._matches(text):
+            found.update(self._implied[match])
+        return found
+
+    def classify(self, text: str) -> Dict[str, Optional[str]]:
+        """First matching label of every table (or the table's default) for text"""
+        result = dict(self.defaults)
+        ranks: Dict[str, int] = {}
+        for match in self._matches(text):
+            for name, rank, label in self._labels[match]:
+                if name not in ranks or rank < ranks[name]:
+                    ranks[name] = rank
+                    result[name] = label
+        return result
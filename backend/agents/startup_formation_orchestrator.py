@@ -8,13 +8,35 @@ dynamic role detection, and comprehensive state management.
 import asyncio
 import json
 import logging
+import os
+import uuid
+from collections import deque
 from typing import Dict, Any, List, Optional
 from dataclasses import dataclass, asdict
 from datetime import datetime, timedelta
 from enum import Enum
 
 from .base_agent import BaseAgent, TaskContext, AgentResponse
+from .intent_router import IntentRouter
+from .workflow_graph import ReadyTracker, WorkflowGraph
 from core.mcp_manager import MCPManager
+from core.rate_limiter import PRIORITY_WORKFLOW
+from core.workflow_executor import WorkflowExecutor, WorkflowQueueFull, workflow_executor
+from core.workflow_store import WorkflowStore, workflow_store
+
+INTENT_ROUTER = IntentRouter(
+    {
+        "action": [
+            ("create_startup", ["create startup", "form company"]),
+            ("check_status", ["check status", "workflow status"]),
+            ("get_workflow_visualization", ["visualization", "flowchart"])
+        ]
+    },
+    defaults={"action": "unknown"}
+)
+
+# Steps of one workflow that may run at the same time
+WORKFLOW_STEP_CONCURRENCY = int(os.getenv("WORKFLOW_STEP_CONCURRENCY", "4"))
 
 class FounderRole(Enum):
     CEO = "ceo"
@@ -77,11 +99,67 @@ class WorkflowState:
     completed_at: Optional[datetime] = None
     current_step: Optional[str] = None
     progress_percentage: float = 0.0
+    template: str = "llc"  # key into the orchestrator's workflow templates
+    user_id: Optional[str] = None
+
+def _to_json(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, dict):
+        return {key: _to_json(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_to_json(item) for item in value]
+    return value
+
+def _parse_datetime(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
+
+def workflow_to_dict(workflow_state: WorkflowState) -> Dict[str, Any]:
+    """JSON-serializable snapshot of a workflow, as persisted by the workflow store"""
+    return _to_json(asdict(workflow_state))
+
+def workflow_from_dict(data: Dict[str, Any]) -> WorkflowState:
+    """Rebuild a workflow from workflow_to_dict output"""
+    company = data["company_info"]
+    return WorkflowState(
+        workflow_id=data["workflow_id"],
+        company_info=CompanyInfo(
+            **{**company, "founders": [
+                FounderInfo(**{**founder, "role": FounderRole(founder["role"])})
+                for founder in company["founders"]
+            ]}
+        ),
+        status=WorkflowStatus(data["status"]),
+        steps={
+            step_id: WorkflowStep(**{
+                **step,
+                "assigned_roles": [FounderRole(role) for role in step["assigned_roles"]],
+                "status": WorkflowStatus(step["status"]),
+                "started_at": _parse_datetime(step["started_at"]),
+                "completed_at": _parse_datetime(step["completed_at"])
+            })
+            for step_id, step in data["steps"].items()
+        },
+        created_at=_parse_datetime(data["created_at"]),
+        updated_at=_parse_datetime(data["updated_at"]),
+        completed_at=_parse_datetime(data["completed_at"]),
+        current_step=data["current_step"],
+        progress_percentage=data["progress_percentage"],
+        template=data.get("template", "llc"),
+        user_id=data.get("user_id")
+    )
 
 class StartupFormationOrchestrator(BaseAgent):
     """Main orchestrator for startup formation workflows"""
 
-    def __init__(self, mcp_manager: MCPManager):
+    def __init__(
+        self,
+        mcp_manager: MCPManager,
+        executor: Optional[WorkflowExecutor] = None,
+        store: Optional[WorkflowStore] = None
+    ):
         super().__init__(
             name="startup_formation_orchestrator",
             description="Coordinates end-to-end startup formation with multi-founder support",
@@ -90,6 +168,11 @@ class StartupFormationOrchestrator(BaseAgent):
 
         self.active_workflows: Dict[str, WorkflowState] = {}
         self.workflow_templates: Dict[str, List[WorkflowStep]] = {}
+        self.workflow_graphs: Dict[str, WorkflowGraph] = {}
+        self.step_concurrency = WORKFLOW_STEP_CONCURRENCY
+        self.executor = executor or workflow_executor
+        self.store = store or workflow_store
+        self.store.on_lease_lost = self._abandon_workflow
 
         # Initialize workflow templates
         self._initialize_workflow_templates()
@@ -108,7 +191,7 @@ class StartupFormationOrchestrator(BaseAgent):
 
             # Try to connect to required MCP servers but don't fail if some are unavailable
             try:
-                connection_results = await self.mcp_manager.connect_all()
+                connection_results = await self.mcp_manager.ensure_connected()
                 self.logger.info(f"MCP connection results: {connection_results}")
             except Exception as e:
                 self.logger.warning(f"MCP connection failed, continuing anyway: {e}")
@@ -251,6 +334,10 @@ class StartupFormationOrchestrator(BaseAgent):
 
         self.workflow_templates["corporation"] = corp_steps
 
+        # Compile dependency graphs once; a broken template fails here, not mid-workflow
+        for template, steps in self.workflow_templates.items():
+            self.workflow_graphs[template] = WorkflowGraph.compile((step.step_id, step.dependencies) for step in steps)
+
     def get_required_mcp_servers(self) -> List[str]:
         """Return required MCP servers for startup formation"""
         return [
@@ -290,16 +377,7 @@ class StartupFormationOrchestrator(BaseAgent):
     def _parse_task_request(self, task: str) -> Dict[str, Any]:
         """Parse task string to extract structured request data"""
         # This is a simplified parser - in production, use proper NLP or structured input
-        task_lower = task.lower()
-
-        if "create startup" in task_lower or "form company" in task_lower:
-            return {"action": "create_startup"}
-        elif "check status" in task_lower or "workflow status" in task_lower:
-            return {"action": "check_status"}
-        elif "visualization" in task_lower or "flowchart" in task_lower:
-            return {"action": "get_workflow_visualization"}
-        else:
-            return {"action": "unknown"}
+        return {"action": INTENT_ROUTER.classify(task)["action"]}
 
     async def _create_startup_workflow(self, task_data: Dict[str, Any], context: TaskContext) -> Dict[str, Any]:
         """Create a new startup formation workflow"""
@@ -330,7 +408,12 @@ class StartupFormationOrchestrator(BaseAgent):
         )
 
         # Create workflow ID
-        workflow_id = f"wf_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        workflow_id = f"wf_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+
+        # Workflow steps are based on entity type
+        template = company_info.entity_type.lower()
+        if template not in self.workflow_templates:
+            template = "llc"
 
         # Initialize workflow state
         workflow_state = WorkflowState(
@@ -339,13 +422,12 @@ class StartupFormationOrchestrator(BaseAgent):
             status=WorkflowStatus.IN_PROGRESS,
             steps={},
             created_at=datetime.now(),
-            updated_at=datetime.now()
+            updated_at=datetime.now(),
+            template=template,
+            user_id=context.user_id
         )
 
-        # Add workflow steps based on entity type
-        template_steps = self.workflow_templates.get(company_info.entity_type.lower(), self.workflow_templates["llc"])
-
-        for step in template_steps:
+        for step in self.workflow_templates[template]:
             # Create a copy of the step for this workflow
             workflow_step = WorkflowStep(
                 step_id=step.step_id,
@@ -364,14 +446,27 @@ class StartupFormationOrchestrator(BaseAgent):
         # Store the workflow
         self.active_workflows[workflow_id] = workflow_state
 
-        # Start workflow execution in background
-        asyncio.create_task(self._execute_workflow(workflow_id, context))
+        # Hand execution to the shared bounded executor; it may have to wait its turn
+        try:
+            execution = self.executor.submit(workflow_id, lambda: self._execute_workflow(workflow_id, context))
+        except (WorkflowQueueFull, RuntimeError) as e:
+            del self.active_workflows[workflow_id]
+            return {
+                "success": False,
+                "message": f"Startup formation workflow not created: {e}",
+                "data": {"error": "workflow_queue_full" if isinstance(e, WorkflowQueueFull) else "shutting_down"}
+            }
+
+        if execution == "queued":
+            workflow_state.status = WorkflowStatus.PENDING
+        self._persist(workflow_state)
 
         return {
             "success": True,
             "message": f"Startup formation workflow created: {workflow_id}",
             "data": {
                 "workflow_id": workflow_id,
+                "execution": execution,
                 "company_name": company_info.name,
                 "entity_type": company_info.entity_type,
                 "estimated_completion": self._calculate_estimated_completion(workflow_state),
@@ -380,53 +475,68 @@ class StartupFormationOrchestrator(BaseAgent):
         }
 
     async def _execute_workflow(self, workflow_id: str, context: TaskContext):
-        """Execute the complete workflow asynchronously"""
+        """Execute the complete workflow asynchronously.
+
+        Steps form a DAG: every step whose dependencies are complete is started
+        at once, up to step_concurrency per workflow, so the workflow takes about
+        as long as its critical path rather than the sum of its steps. A step
+        finishing pushes the dependents it unblocks onto the ready queue right
+        away, found through the template's precompiled dependency graph; pacing
+        against upstream services is left to each MCP server's rate limiter.
+        """
         if workflow_id not in self.active_workflows:
             return
 
         workflow_state = self.active_workflows[workflow_id]
+        workflow_state.status = WorkflowStatus.IN_PROGRESS
+        self._persist(workflow_state)
+
+        # Background workflow steps yield MCP capacity to interactive requests
+        context = TaskContext(
+            user_id=context.user_id,
+            task_id=context.task_id,
+            priority=max(context.priority, PRIORITY_WORKFLOW),
+            metadata=context.metadata
+        )
 
+        tracker = ReadyTracker(
+            self.workflow_graphs[workflow_state.template],
+            completed=[step_id for step_id, step in workflow_state.steps.items() if step.status == WorkflowStatus.COMPLETED]
+        )
+        ready = deque(
+            step_id for step_id in tracker.ready()
+            if workflow_state.steps[step_id].status != WorkflowStatus.FAILED
+        )
+        running: Dict[str, asyncio.Task] = {}
+        finished: asyncio.Queue = asyncio.Queue()
         try:
-            while True:
-                # Find the next step to execute
-                next_step = self._find_next_executable_step(workflow_state)
-                if not next_step:
-                    break
-
-                # Execute the step
-                await self._execute_workflow_step(workflow_id, next_step.step_id, context)
+            while ready or running:
+                # Start ready steps, up to the concurrency cap
+                while ready and len(running) < self.step_concurrency:
+                    step_id = ready.popleft()
+                    task = asyncio.create_task(self._execute_workflow_step(workflow_id, step_id, context))
+                    task.add_done_callback(lambda _task, step_id=step_id: finished.put_nowait(step_id))
+                    running[step_id] = task
+
+                # Wait for the next step to finish
+                step_id = await finished.get()
+                running.pop(step_id).result()
 
                 # Update progress
                 self._update_workflow_progress(workflow_state)
 
-                # Check if workflow is complete
-                if workflow_state.status == WorkflowStatus.COMPLETED:
-                    break
-
-                # Small delay between steps
-                await asyncio.sleep(1)
+                if workflow_state.steps[step_id].status == WorkflowStatus.COMPLETED:
+                    ready.extend(tracker.complete(step_id))
 
         except Exception as e:
             self.logger.error(f"Workflow execution failed for {workflow_id}: {e}")
             workflow_state.status = WorkflowStatus.FAILED
             workflow_state.updated_at = datetime.now()
+            self._persist(workflow_state)
 
-    def _find_next_executable_step(self, workflow_state: WorkflowState) -> Optional[WorkflowStep]:
-        """Find the next step that can be executed"""
-        for step in workflow_state.steps.values():
-            if (step.status == WorkflowStatus.PENDING and
-                self._check_dependencies_met(step, workflow_state)):
-                return step
-        return None
-
-    def _check_dependencies_met(self, step: WorkflowStep, workflow_state: WorkflowState) -> bool:
-        """Check if all dependencies for a step are met"""
-        for dep_id in step.dependencies:
-            if dep_id in workflow_state.steps:
-                dep_step = workflow_state.steps[dep_id]
-                if dep_step.status != WorkflowStatus.COMPLETED:
-                    return False
-        return True
+        finally:
+            for task in running.values():
+                task.cancel()
 
     async def _execute_workflow_step(self, workflow_id: str, step_id: str, context: TaskContext):
         """Execute a specific workflow step"""
@@ -436,39 +546,42 @@ class StartupFormationOrchestrator(BaseAgent):
         workflow_state = self.active_workflows[workflow_id]
         step = workflow_state.steps[step_id]
 
-        # Mark step as in progress
-        step.status = WorkflowStatus.IN_PROGRESS
-        step.started_at = datetime.now()
-        workflow_state.current_step = step_id
-        workflow_state.updated_at = datetime.now()
+        # Wait for one of the executor's global step slots
+        async with self.executor.step_slot():
+            # Mark step as in progress
+            step.status = WorkflowStatus.IN_PROGRESS
+            step.started_at = datetime.now()
+            workflow_state.current_step = step_id
+            workflow_state.updated_at = datetime.now()
+            self._persist(workflow_state)
 
-        try:
-            # Execute the step based on its type
-            result = await self._execute_step_action(step, workflow_state, context)
+            try:
+                # Execute the step based on its type
+                result = await self._execute_step_action(step, workflow_state, context)
 
-            # Mark step as completed
-            step.status = WorkflowStatus.COMPLETED
-            step.completed_at = datetime.now()
-            step.result = result
+                # Mark step as completed
+                step.status = WorkflowStatus.COMPLETED
+                step.completed_at = datetime.now()
+                step.result = result
 
-            # Calculate actual duration
-            if step.started_at:
-                duration = datetime.now() - step.started_at
-                step.actual_duration = int(duration.total_seconds() / 60)
+                # Calculate actual duration
+                if step.started_at:
+                    duration = datetime.now() - step.started_at
+                    step.actual_duration = int(duration.total_seconds() / 60)
 
-        except Exception as e:
-            step.status = WorkflowStatus.FAILED
-            step.error = str(e)
-            step.completed_at = datetime.now()
-            workflow_state.status = WorkflowStatus.FAILED
+            except Exception as e:
+                step.status = WorkflowStatus.FAILED
+                step.error = str(e)
+                step.completed_at = datetime.now()
+                workflow_state.status = WorkflowStatus.FAILED
 
     async def _execute_step_action(self, step: WorkflowStep, workflow_state: WorkflowState, context: TaskContext) -> Dict[str, Any]:
         """Execute the specific action for a workflow step"""
 
         if step.step_id == "analyze_requirements":
-            return await self._analyze_business_requirements(workflow_state)
+            return await self._analyze_business_requirements(workflow_state, context)
         elif step.step_id == "name_availability":
-            return await self._check_name_availability(workflow_state)
+            return await self._check_name_availability(workflow_state, context)
         elif step.step_id == "prepare_articles":
             return await self._prepare_articles_of_organization(workflow_state)
         elif step.step_id == "file_state_registration":
@@ -486,16 +599,17 @@ class StartupFormationOrchestrator(BaseAgent):
         elif step.step_id == "generate_operating_agreement":
             return await self._generate_operating_agreement(workflow_state)
         else:
-            return await self._execute_mcp_step(step, workflow_state)
+            return await self._execute_mcp_step(step, workflow_state, context)
 
-    async def _analyze_business_requirements(self, workflow_state: WorkflowState) -> Dict[str, Any]:
+    async def _analyze_business_requirements(self, workflow_state: WorkflowState, context: TaskContext) -> Dict[str, Any]:
         """Analyze business requirements and recommend structure"""
         company = workflow_state.company_info
 
         # Query MCP servers for business structure recommendations
         mcp_results = await self.query_mcp_servers(
             f"Analyze business structure for {company.industry} {company.entity_type} in {company.state}",
-            ["wa_sos", "legal_us"]
+            ["wa_sos", "legal_us"],
+            context
         )
 
         return {
@@ -505,14 +619,15 @@ class StartupFormationOrchestrator(BaseAgent):
             "mcp_sources": list(mcp_results.keys())
         }
 
-    async def _check_name_availability(self, workflow_state: WorkflowState) -> Dict[str, Any]:
+    async def _check_name_availability(self, workflow_state: WorkflowState, context: TaskContext) -> Dict[str, Any]:
         """Check business name availability"""
         company = workflow_state.company_info
 
         # Query state SOS for name availability
         mcp_results = await self.query_mcp_servers(
             f"Check availability of business name: {company.name}",
-            ["wa_sos"]
+            ["wa_sos"],
+            context
         )
 
         return {
@@ -639,6 +754,56 @@ class StartupFormationOrchestrator(BaseAgent):
             workflow_state.completed_at = datetime.now()
 
         workflow_state.updated_at = datetime.now()
+        self._persist(workflow_state)
+
+    def _persist(self, workflow_state: WorkflowState):
+        """Queue the workflow's current state for the next write-behind flush"""
+        self.store.save(workflow_state.workflow_id, lambda: workflow_to_dict(workflow_state))
+
+    def _abandon_workflow(self, workflow_id: str):
+        """Stop running a workflow that another process has taken over"""
+        self.active_workflows.pop(workflow_id, None)
+        self.executor.cancel(workflow_id)
+
+    async def recover_workflows(self) -> int:
+        """Resume unfinished workflows persisted by a previous or crashed process"""
+        try:
+            saved = await self.store.claim_unfinished()
+        except Exception as e:
+            self.logger.error(f"Failed to load unfinished workflows: {e}")
+            return 0
+
+        resumed = 0
+        for data in saved:
+            try:
+                workflow_state = workflow_from_dict(data)
+            except Exception as e:
+                self.logger.error(f"Skipping unreadable workflow {data.get('workflow_id')}: {e}")
+                continue
+
+            # Steps interrupted mid-flight run again
+            for step in workflow_state.steps.values():
+                if step.status == WorkflowStatus.IN_PROGRESS:
+                    step.status = WorkflowStatus.PENDING
+                    step.started_at = None
+
+            workflow_id = workflow_state.workflow_id
+            self.active_workflows[workflow_id] = workflow_state
+            context = TaskContext(
+                user_id=workflow_state.user_id or "anonymous",
+                task_id=f"resume_{workflow_id}",
+                priority=PRIORITY_WORKFLOW
+            )
+            try:
+                self.executor.submit(workflow_id, lambda workflow_id=workflow_id, context=context: self._execute_workflow(workflow_id, context))
+            except (WorkflowQueueFull, RuntimeError) as e:
+                self.logger.error(f"Could not resume workflow {workflow_id}: {e}")
+                continue
+            resumed += 1
+
+        if saved:
+            self.logger.info(f"Resumed {resumed} of {len(saved)} unfinished workflows")
+        return resumed
 
     def _calculate_estimated_completion(self, workflow_state: WorkflowState) -> str:
         """Calculate estimated completion time"""
@@ -665,7 +830,15 @@ class StartupFormationOrchestrator(BaseAgent):
 
     async def _start_next_workflow_step(self, workflow_state: WorkflowState):
         """Start the next available workflow step"""
-        next_step = self._find_next_executable_step(workflow_state)
+        tracker = ReadyTracker(
+            self.workflow_graphs[workflow_state.template],
+            completed=[step_id for step_id, step in workflow_state.steps.items() if step.status == WorkflowStatus.COMPLETED]
+        )
+        next_step = next(
+            (workflow_state.steps[step_id] for step_id in tracker.ready()
+             if workflow_state.steps[step_id].status == WorkflowStatus.PENDING),
+            None
+        )
         if next_step:
             next_step.status = WorkflowStatus.IN_PROGRESS
             next_step.started_at = datetime.now()
@@ -776,10 +949,24 @@ class StartupFormationOrchestrator(BaseAgent):
         if workflow_id not in self.active_workflows:
             return None
 
-        workflow_state = self.active_workflows[workflow_id]
+        return self._summarize(self.active_workflows[workflow_id])
+
+    async def find_workflow_summary(self, workflow_id: str) -> Optional[Dict[str, Any]]:
+        """Summary of a workflow run by this process or, from the database, by another worker"""
+        summary = self.get_workflow_summary(workflow_id)
+        if summary is not None:
+            return summary
+
+        try:
+            data = await self.store.load(workflow_id)
+            return self._summarize(workflow_from_dict(data)) if data else None
+        except Exception as e:
+            self.logger.error(f"Failed to load workflow {workflow_id}: {e}")
+            return None
 
+    def _summarize(self, workflow_state: WorkflowState) -> Dict[str, Any]:
         return {
-            "workflow_id": workflow_id,
+            "workflow_id": workflow_state.workflow_id,
             "company_name": workflow_state.company_info.name,
             "status": workflow_state.status.value,
             "progress": workflow_state.progress_percentage,
@@ -795,7 +982,7 @@ class StartupFormationOrchestrator(BaseAgent):
             for wf_id in self.active_workflows.keys()
         ]
 
-    async def _execute_mcp_step(self, step: WorkflowStep, workflow_state: WorkflowState) -> Dict[str, Any]:
+    async def _execute_mcp_step(self, step: WorkflowStep, workflow_state: WorkflowState, context: TaskContext) -> Dict[str, Any]:
         """Execute a step that requires MCP server interaction"""
         company = workflow_state.company_info
 
@@ -824,7 +1011,8 @@ class StartupFormationOrchestrator(BaseAgent):
         try:
             mcp_results = await self.query_mcp_servers(
                 f"Execute {step.name} for {company.name}",
-                mcp_servers
+                mcp_servers,
+                context
             )
 
             return {
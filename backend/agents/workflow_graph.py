@@ -0,0 +1,104 @@
+"""
+Dependency graphs for workflow templates
+
+A template's steps are compiled once into adjacency lists (step -> the steps
+that depend on it) with in-degree counts, validated for unknown dependencies
+and cycles. Each running workflow then tracks readiness with a ReadyTracker:
+completing a step decrements the remaining in-degree of its dependents and
+returns the ones that reached zero, so finding the next steps costs O(edges
+out of the completed step) instead of a scan over every step.
+"""
+
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+
+@dataclass(frozen=True)
+class WorkflowGraph:
+    """Validated dependency DAG of a workflow template"""
+    order: Tuple[str, ...]  # topological order, ties in template order
+    dependents: Dict[str, Tuple[str, ...]]
+    in_degree: Dict[str, int]
+
+    @classmethod
+    def compile(cls, steps: Iterable[Tuple[str, Sequence[str]]]) -> "WorkflowGraph":
+        """Build the graph from (step_id, dependencies) pairs.
+
+        Raises ValueError for duplicate step ids, dependencies on steps that
+        are not in the template, and dependency cycles.
+        """
+        steps = list(steps)
+        dependents: Dict[str, List[str]] = {}
+        for step_id, _ in steps:
+            if step_id in dependents:
+                raise ValueError(f"Duplicate workflow step: {step_id}")
+            dependents[step_id] = []
+
+        in_degree: Dict[str, int] = {}
+        for step_id, dependencies in steps:
+            unique = list(dict.fromkeys(dependencies))
+            missing = [dependency for dependency in unique if dependency not in dependents]
+            if missing:
+                raise ValueError(f"Workflow step {step_id} depends on unknown steps: {missing}")
+            for dependency in unique:
+                dependents[dependency].append(step_id)
+            in_degree[step_id] = len(unique)
+
+        # Kahn's algorithm; whatever never reaches in-degree zero is on a cycle
+        remaining = dict(in_degree)
+        ready = deque(step_id for step_id, _ in steps if remaining[step_id] == 0)
+        order = []
+        while ready:
+            step_id = ready.popleft()
+            order.append(step_id)
+            for dependent in dependents[step_id]:
+                remaining[dependent] -= 1
+                if remaining[dependent] == 0:
+                    ready.append(dependent)
+
+        if len(order) < len(steps):
+            cyclic = [step_id for step_id, _ in steps if remaining[step_id] > 0]
+            raise ValueError(f"Workflow steps form a dependency cycle: {cyclic}")
+
+        return cls(
+            order=tuple(order),
+            dependents={step_id: tuple(children) for step_id, children in dependents.items()},
+            in_degree=in_degree
+        )
+
+    @property
+    def roots(self) -> List[str]:
+        """Steps without dependencies"""
+        return [step_id for step_id in self.order if self.in_degree[step_id] == 0]
+
+
+class ReadyTracker:
+    """Remaining dependency counts of one workflow instance"""
+
+    def __init__(self, graph: WorkflowGraph, completed: Iterable[str] = ()):
+        self.graph = graph
+        self.remaining = dict(graph.in_degree)
+        self.completed = set()
+        for step_id in completed:
+            self.complete(step_id)
+
+    def complete(self, step_id: str) -> List[str]:
+        """Mark a step complete; returns the dependents that became ready"""
+        if step_id in self.completed:
+            return []
+        self.completed.add(step_id)
+
+        unblocked = []
+        for dependent in self.graph.dependents[step_id]:
+            self.remaining[dependent] -= 1
+            if self.remaining[dependent] == 0:
+                unblocked.append(dependent)
+        return unblocked
+
+    def ready(self) -> List[str]:
+        """Steps that are not complete and have no outstanding dependencies"""
+        return [
+            step_id for step_id in self.graph.order
+            if self.remaining[step_id] == 0 and step_id not in self.completed
+        ]
@@ -0,0 +1,87 @@
+"""
+Micro-benchmark: IntentRouter against the keyword scans it replaced
+
+Reads the same task the way BusinessFormationAgent used to (a lowercase copy
+and an `any(keyword in task_lower ...)` chain per question) and with the
+compiled INTENT_ROUTER, for task descriptions of increasing length.
+
+Run from backend/:  python -m benchmarks.intent_router_benchmark
+"""
+
+import random
+import timeit
+
+from agents.business_formation_agent import INTENT_ROUTER
+
+FILLER = (
+    "we are a small team building an app for local customers in seattle and tacoma our product helps "
+    "people find yoga classes book instructors and pay online we plan to hire two developers this year "
+    "and open an office downtown the founders have experience running studios and want advice on what "
+    "paperwork is needed before launch including insurance bank accounts and contracts with instructors"
+).split()
+ENDING = "we would like to form an llc and grow into other states"
+
+
+def legacy_read(task: str) -> dict:
+    """Route, business type, industry and characteristics as the agent computed them before"""
+    task_lower = task.lower()
+    if any(keyword in task_lower for keyword in ["register", "incorporate", "form", "start"]):
+        route = "registration"
+    elif any(keyword in task_lower for keyword in ["license", "permit", "certification"]):
+        route = "license"
+    elif any(keyword in task_lower for keyword in ["tax", "taxes", "ein", "federal tax"]):
+        route = "tax"
+    elif any(keyword in task_lower for keyword in ["structure", "llc", "corporation", "partnership"]):
+        route = "structure"
+    elif any(keyword in task_lower for keyword in ["compliance", "requirements", "regulations"]):
+        route = "compliance"
+    else:
+        route = "general"
+
+    task_lower = task.lower()
+    if any(word in task_lower for word in ["llc", "limited liability"]):
+        business_type = "LLC"
+    elif any(word in task_lower for word in ["corporation", "corp", "inc"]):
+        business_type = "Corporation"
+    elif any(word in task_lower for word in ["partnership", "llp"]):
+        business_type = "Partnership"
+    elif any(word in task_lower for word in ["nonprofit", "501c3"]):
+        business_type = "Nonprofit"
+    else:
+        business_type = "LLC"
+
+    task_lower = task.lower()
+    industry = next((industry for industry in [
+        "technology", "software", "consulting", "retail", "restaurant",
+        "healthcare", "manufacturing", "real estate", "professional services"
+    ] if industry in task_lower), "general business")
+
+    return {
+        "route": route,
+        "business_type": business_type,
+        "industry": industry,
+        "liability_concerns": "high" if "high risk" in task.lower() else "medium",
+        "growth_plans": "aggressive" if any(word in task.lower() for word in ["scale", "grow", "expand"]) else "moderate",
+        "ownership_structure": "multiple" if any(word in task.lower() for word in ["partners", "multiple owners"]) else "single",
+        "industry_risk": "high" if any(word in task.lower() for word in ["healthcare", "construction", "manufacturing"]) else "low"
+    }
+
+
+def make_task(words: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    return " ".join(rng.choice(FILLER) for _ in range(words)) + " " + ENDING
+
+
+def main():
+    print(f"{'chars':>8} {'legacy us':>11} {'router us':>11} {'speedup':>8}")
+    for words in (20, 200, 2000, 20000):
+        task = make_task(words)
+        assert legacy_read(task) == INTENT_ROUTER.classify(task)
+        number = max(10, 200000 // (words + 20))
+        legacy = min(timeit.repeat(lambda: legacy_read(task), number=number, repeat=5)) / number
+        router = min(timeit.repeat(lambda: INTENT_ROUTER.classify(task), number=number, repeat=5)) / number
+        print(f"{len(task):>8} {legacy * 1e6:>11.1f} {router * 1e6:>11.1f} {legacy / router:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
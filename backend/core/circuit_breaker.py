@@ -0,0 +1,137 @@
+"""
+Circuit breaker for MCP server connections
+
+Tracks request outcomes over a rolling time window. When the failure rate
+crosses the threshold the circuit opens and requests are rejected immediately
+(callers serve a cached or mock answer instead of waiting on the network).
+After a cool-down the circuit goes half-open and lets a single probe request
+through: success closes it again, failure re-opens it. A probe that ends
+without an outcome (e.g. its caller was cancelled) hands its slot back
+through release(), so the next request can probe instead.
+"""
+
+import time
+from collections import deque
+from enum import Enum
+from typing import Deque, Dict, Any, Optional, Tuple
+
+
+class CircuitState(Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Rolling failure-rate circuit breaker"""
+
+    def __init__(
+        self,
+        failure_rate_threshold: float = 0.5,
+        window_seconds: float = 60.0,
+        min_requests: int = 5,
+        open_seconds: float = 30.0,
+        half_open_max_calls: int = 1
+    ):
+        self.failure_rate_threshold = failure_rate_threshold
+        self.window_seconds = window_seconds
+        self.min_requests = min_requests
+        self.open_seconds = open_seconds
+        self.half_open_max_calls = half_open_max_calls
+
+        self.state = CircuitState.CLOSED
+        self.times_opened = 0
+        self.rejected_requests = 0
+        self._outcomes: Deque[Tuple[float, bool]] = deque()  # (timestamp, succeeded)
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._half_open_calls = 0
+
+    def _prune(self, now: float):
+        """Drop outcomes that have left the rolling window"""
+        cutoff = now - self.window_seconds
+        while self._outcomes and self._outcomes[0][0] < cutoff:
+            _, succeeded = self._outcomes.popleft()
+            if not succeeded:
+                self._failures -= 1
+
+    @property
+    def failure_rate(self) -> float:
+        """Failure rate over the rolling window"""
+        self._prune(time.monotonic())
+        return self._failures / len(self._outcomes) if self._outcomes else 0.0
+
+    def allow_request(self) -> bool:
+        """Whether a request may go to the upstream right now"""
+        if self.state == CircuitState.OPEN:
+            if time.monotonic() - self._opened_at < self.open_seconds:
+                self.rejected_requests += 1
+                return False
+            self.state = CircuitState.HALF_OPEN
+            self._half_open_calls = 0
+
+        if self.state == CircuitState.HALF_OPEN:
+            if self._half_open_calls >= self.half_open_max_calls:
+                self.rejected_requests += 1
+                return False
+            self._half_open_calls += 1
+
+        return True
+
+    def record_success(self):
+        """Record a successful upstream request"""
+        if self.state == CircuitState.HALF_OPEN:
+            self._close()
+            return
+        self._record(True)
+
+    def release(self):
+        """Give back a half-open probe slot whose request ended without an outcome"""
+        if self.state == CircuitState.HALF_OPEN and self._half_open_calls > 0:
+            self._half_open_calls -= 1
+
+    def record_failure(self):
+        """Record a failed upstream request"""
+        if self.state == CircuitState.HALF_OPEN:
+            self._open()
+            return
+
+        self._record(False)
+        if (self.state == CircuitState.CLOSED
+                and len(self._outcomes) >= self.min_requests
+                and self._failures / len(self._outcomes) >= self.failure_rate_threshold):
+            self._open()
+
+    def _record(self, succeeded: bool):
+        now = time.monotonic()
+        self._outcomes.append((now, succeeded))
+        if not succeeded:
+            self._failures += 1
+        self._prune(now)
+
+    def _open(self):
+        self.state = CircuitState.OPEN
+        self._opened_at = time.monotonic()
+        self.times_opened += 1
+
+    def _close(self):
+        self.state = CircuitState.CLOSED
+        self._opened_at = None
+        self._outcomes.clear()
+        self._failures = 0
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get breaker state and rolling-window counters"""
+        self._prune(time.monotonic())
+        # Report a cooled-down open circuit as half-open even before the next request
+        state = self.state
+        if state == CircuitState.OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+            state = CircuitState.HALF_OPEN
+
+        return {
+            "state": state.value,
+            "failure_rate": round(self.failure_rate, 3),
+            "window_requests": len(self._outcomes),
+            "times_opened": self.times_opened,
+            "rejected_requests": self.rejected_requests
+        }
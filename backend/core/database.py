@@ -64,6 +64,19 @@ class AgentActivity(Base):
     agent_metadata = Column(JSON)
     created_at = Column(DateTime, default=datetime.utcnow)
 
+class WorkflowRecord(Base):
+    """Persisted startup formation workflow state (see core.workflow_store)"""
+    __tablename__ = "workflows"
+
+    workflow_id = Column(String, primary_key=True)
+    template = Column(String)
+    status = Column(String, index=True)  # pending, in_progress, completed, failed
+    state = Column(JSON)  # full serialized WorkflowState
+    owner = Column(String, nullable=True, index=True)  # process currently running the workflow
+    lease_expires_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
 # Create tables
 def create_tables():
     """Create all database tables"""
@@ -0,0 +1,91 @@
+"""
+HTML parsing for web-scraping MCP servers
+
+BeautifulSoup parsing of large government pages is CPU-bound, so it runs in a
+worker pool instead of on the asyncio event loop. The pool type and size are
+configurable, documents are capped in size before parsing, and lxml is used
+as the parser backend when it is installed.
+"""
+
+import asyncio
+import logging
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, Any, Optional
+
+from bs4 import BeautifulSoup
+
+from .snippet_index import SnippetIndex, split_passages
+
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
+logger = logging.getLogger(__name__)
+
+PARSE_EXECUTOR = os.getenv("MCP_PARSE_EXECUTOR", "process")  # 'process' or 'thread'
+PARSE_WORKERS = int(os.getenv("MCP_PARSE_WORKERS", "2"))
+MAX_DOCUMENT_CHARS = int(os.getenv("MCP_MAX_DOCUMENT_CHARS", str(2 * 1024 * 1024)))
+
+# Bump when parse_html's output changes so persisted parses are redone
+PARSE_FORMAT = 2
+
+_executor: Optional[Executor] = None
+
+
+def parse_html(html: str) -> Dict[str, Any]:
+    """Extract the title and an indexed passage list from an HTML document (runs in a worker)"""
+    soup = BeautifulSoup(html, HTML_PARSER)
+    title = soup.title.string if soup.title else None
+    # Newline separator keeps block elements apart so passages split cleanly
+    text = soup.get_text("\n")
+    return {
+        # Plain str: a NavigableString would keep (and pickle) the whole tree
+        "title": str(title) if title is not None else "",
+        "text_length": len(text),
+        "index": SnippetIndex.build(split_passages(text)).to_dict()
+    }
+
+
+def get_parse_executor() -> Executor:
+    """Return the shared parse pool, creating it on first use"""
+    global _executor
+    if _executor is None:
+        if PARSE_EXECUTOR == "thread":
+            _executor = ThreadPoolExecutor(max_workers=PARSE_WORKERS, thread_name_prefix="mcp-parse")
+        else:
+            _executor = ProcessPoolExecutor(max_workers=PARSE_WORKERS)
+        logger.info(f"HTML parse pool started: {PARSE_EXECUTOR} x{PARSE_WORKERS} ({HTML_PARSER})")
+    return _executor
+
+
+async def parse_html_async(html: str, max_chars: int = MAX_DOCUMENT_CHARS) -> Dict[str, Any]:
+    """Parse a document in the worker pool, truncating it to max_chars first"""
+    truncated = len(html) > max_chars
+    if truncated:
+        html = html[:max_chars]
+
+    loop = asyncio.get_running_loop()
+    parsed = await loop.run_in_executor(get_parse_executor(), parse_html, html)
+    parsed["truncated"] = truncated
+    return parsed
+
+
+def shutdown_parse_executor():
+    """Stop the parse pool (called on application shutdown)"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def get_parser_info() -> Dict[str, Any]:
+    """Describe the parse pool configuration"""
+    return {
+        "executor": PARSE_EXECUTOR,
+        "workers": PARSE_WORKERS,
+        "parser": HTML_PARSER,
+        "max_document_chars": MAX_DOCUMENT_CHARS
+    }
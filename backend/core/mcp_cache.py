@@ -0,0 +1,200 @@
+"""
+Response caching for MCP server queries
+
+Bounded in-memory TTL cache keyed on (server, query, params) with LRU eviction.
+Error responses are cached too (negative caching) under a shorter TTL so a
+failing upstream is not hammered by every agent that needs it. A negative
+entry keeps the last successful response for its key, so get_stale() can
+still serve it while the upstream is failing.
+
+Cache misses that arrive while an identical query is already in flight are
+coalesced onto that single upstream request (single-flight).
+"""
+
+import asyncio
+import json
+import time
+from collections import OrderedDict, Counter
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, Tuple, Callable, Awaitable
+
+CacheKey = Tuple[str, str, str]
+
+
+def make_cache_key(server_name: str, query: str, params: Optional[Dict] = None) -> CacheKey:
+    """Build a hashable cache key; params are serialized with sorted keys"""
+    params_key = json.dumps(params, sort_keys=True, default=str) if params else ""
+    return (server_name, query, params_key)
+
+
+@dataclass
+class CacheEntry:
+    """A cached response and its expiry time"""
+    value: Dict[str, Any]
+    expires_at: float
+    is_error: bool = False
+    last_good: Optional[Dict[str, Any]] = None  # last successful response, kept by error entries
+
+
+class ResponseCache:
+    """TTL + LRU cache for MCP responses"""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[CacheKey, CacheEntry]" = OrderedDict()
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self.evictions = 0
+
+    def get(self, key: CacheKey) -> Optional[Dict[str, Any]]:
+        """Return a fresh cached response, or None on a miss"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        if entry.expires_at <= time.monotonic():
+            # Expired entries stay until evicted so they can be served stale by get_stale()
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        if entry.is_error:
+            self.negative_hits += 1
+        return entry.value
+
+    def get_stale(self, key: CacheKey) -> Optional[Dict[str, Any]]:
+        """Return the last successful response for key even if expired, or None"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value = entry.last_good if entry.is_error else entry.value
+        if value is None:
+            return None
+        self.stale_hits += 1
+        return value
+
+    def ttl_remaining(self, key: CacheKey) -> Optional[float]:
+        """Seconds until a cached successful response expires (negative if expired), or None"""
+        entry = self._entries.get(key)
+        if entry is None or entry.is_error:
+            return None
+        return entry.expires_at - time.monotonic()
+
+    def set(self, key: CacheKey, value: Dict[str, Any], ttl: float, is_error: bool = False):
+        """Store a response for ttl seconds, evicting least recently used entries.
+
+        An error never replaces a fresh successful response, and an error that
+        replaces an expired one keeps it as last_good for get_stale().
+        """
+        if ttl <= 0 or self.max_entries <= 0:
+            return
+
+        now = time.monotonic()
+        last_good = None
+        if is_error:
+            previous = self._entries.get(key)
+            if previous is not None and not previous.is_error:
+                if previous.expires_at > now:
+                    return
+                last_good = previous.value
+            elif previous is not None:
+                last_good = previous.last_good
+
+        self._entries[key] = CacheEntry(value=value, expires_at=now + ttl, is_error=is_error, last_good=last_good)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, server_name: Optional[str] = None):
+        """Drop all entries, or only those for one server"""
+        if server_name is None:
+            self._entries.clear()
+            return
+        for key in [key for key in self._entries if key[0] == server_name]:
+            del self._entries[key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache counters"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "stale_hits": self.stale_hits,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0
+        }
+
+
+# Upper bounds for the callers-per-upstream-request distribution
+FANOUT_BUCKETS = (1, 2, 4, 8, 16, 32, 64)
+
+
+@dataclass
+class _Flight:
+    """An upstream request shared by one or more callers"""
+    task: asyncio.Task
+    callers: int = 1
+
+
+class SingleFlight:
+    """Coalesce concurrent identical calls onto one in-flight task"""
+
+    def __init__(self):
+        self._inflight: Dict[CacheKey, _Flight] = {}
+        self.upstream_requests = 0
+        self.coalesced_callers = 0
+        self.max_callers = 0
+        self._fanout: Counter = Counter()
+
+    async def do(self, key: CacheKey, fn: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        """Run fn() unless an identical call is in flight, in which case share its result"""
+        flight = self._inflight.get(key)
+        if flight is None:
+            flight = _Flight(task=asyncio.ensure_future(fn()))
+            self._inflight[key] = flight
+            self.upstream_requests += 1
+            flight.task.add_done_callback(lambda _task, key=key, flight=flight: self._finish(key, flight))
+        else:
+            flight.callers += 1
+            self.coalesced_callers += 1
+
+        # Shield so one caller being cancelled does not cancel the request for everyone else
+        return await asyncio.shield(flight.task)
+
+    def is_in_flight(self, key: CacheKey) -> bool:
+        """Whether an upstream request for key is currently running"""
+        return key in self._inflight
+
+    def _finish(self, key: CacheKey, flight: _Flight):
+        """Record fan-out for a completed upstream request"""
+        if self._inflight.get(key) is flight:
+            del self._inflight[key]
+
+        if not flight.task.cancelled():
+            # Mark the exception as retrieved even if every caller went away
+            flight.task.exception()
+
+        self.max_callers = max(self.max_callers, flight.callers)
+        bucket = next((bound for bound in FANOUT_BUCKETS if flight.callers <= bound), None)
+        self._fanout[f"<={bucket}" if bucket else f">{FANOUT_BUCKETS[-1]}"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get coalescing counters"""
+        total_callers = self.upstream_requests + self.coalesced_callers
+        return {
+            "in_flight": len(self._inflight),
+            "upstream_requests": self.upstream_requests,
+            "coalesced_callers": self.coalesced_callers,
+            "avg_callers_per_request": round(total_callers / self.upstream_requests, 3) if self.upstream_requests else 0.0,
+            "max_callers_per_request": self.max_callers,
+            "callers_per_request": dict(self._fanout)
+        }
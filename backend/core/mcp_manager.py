@@ -7,10 +7,21 @@ Provides a unified interface for AI agents to access real-time information.
 
 import asyncio
 import logging
+import os
+import time
 from typing import Dict, Optional, Any, List
 from dataclasses import dataclass
 from contextlib import asynccontextmanager
 from .mcp_mock_servers import mock_mcp_manager
+from .mcp_recorder import MCPRecorder, MCPReplayer, RECORD_PATH, REPLAY_PATH, REPLAY_LATENCY_SCALE
+from .rate_limiter import TokenBucket, PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND
+from .mcp_cache import ResponseCache, SingleFlight, make_cache_key
+from .circuit_breaker import CircuitBreaker
+from .html_parsing import PARSE_FORMAT, parse_html_async, shutdown_parse_executor, get_parser_info
+from .page_cache import PageCache, new_page
+from .snippet_index import SnippetIndex
+from .prefetcher import RefreshAheadScheduler
+from .mcp_metrics import LoopLagMonitor, RollingLatency, ServerMetrics, classify_error, render_prometheus
 
 try:
     from mcp import ClientSession, stdio_client
@@ -25,9 +36,16 @@ except ImportError:
         return None
 
 import httpx
-from bs4 import BeautifulSoup
 import json
 
+try:
+    import h2  # noqa: F401  (enables httpx HTTP/2 support)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
 @dataclass
 class MCPServerConfig:
     """Configuration for an MCP server connection"""
@@ -36,19 +54,113 @@ class MCPServerConfig:
     connection_url: str
     authentication: Optional[Dict[str, Any]] = None
     rate_limit: int = 10  # requests per minute
-    timeout: int = 30
+    burst_size: int = 1  # requests allowed back-to-back before rate limiting kicks in
+    timeout: int = 30  # upper bound; the effective timeout adapts to observed latency
+    adaptive_timeout: bool = True
+    timeout_percentile: float = 0.99  # latency percentile the adaptive timeout is based on
+    timeout_margin: float = 1.0  # headroom over that percentile (1.0 = twice the percentile)
+    min_timeout: float = 2.0
+    idempotent: bool = True  # safe to send the same query twice
+    hedge_requests: bool = False  # send a second attempt when the first is slower than hedge_percentile
+    hedge_percentile: float = 0.95
+    cache_ttl: int = 300  # seconds a successful response is reused (0 disables caching)
+    error_cache_ttl: int = 15  # seconds an error response is reused
+    snippet_top_k: int = 5  # passages returned per web-scraping query
+    breaker_failure_rate: float = 0.5  # failure rate that opens the circuit
+    breaker_window: int = 60  # seconds of history the failure rate is computed over
+    breaker_min_requests: int = 5  # requests in the window before the circuit can open
+    breaker_open_seconds: int = 30  # cool-down before a half-open probe is allowed
+    max_connections: int = int(os.getenv("MCP_MAX_CONNECTIONS", "20"))  # per host
+    max_keepalive_connections: int = 10
+    keepalive_expiry: float = 30.0  # seconds an idle pooled connection is kept
+    http2: bool = True  # negotiated via ALPN, falls back to HTTP/1.1
 
 class MCPServerConnection:
     """Represents a connection to an MCP server"""
 
-    def __init__(self, config: MCPServerConfig):
+    def __init__(self, config: MCPServerConfig, page_cache: Optional[PageCache] = None):
         self.config = config
+        self.page_cache = page_cache
+        self._snippet_indexes: Dict[str, Any] = {}  # url -> (parsed page, SnippetIndex)
+        self.latency = RollingLatency()
+        self.metrics = ServerMetrics()
+        self.recorder: Optional[MCPRecorder] = None
+        self.timeouts = 0
+        self.hedged_requests = 0
+        self.hedge_wins = 0
         self.session = None
+        self.connected = False
+        self.client: Optional[httpx.AsyncClient] = None
+        self.rate_limiter = TokenBucket(config.rate_limit, config.burst_size)
+        self.circuit_breaker = CircuitBreaker(
+            failure_rate_threshold=config.breaker_failure_rate,
+            window_seconds=config.breaker_window,
+            min_requests=config.breaker_min_requests,
+            open_seconds=config.breaker_open_seconds
+        )
         self.last_request = 0
         self.request_count = 0
 
+    def _get_client(self) -> httpx.AsyncClient:
+        """Return the pooled keep-alive client for this server, creating it on first use"""
+        if self.client is None or self.client.is_closed:
+            self.client = httpx.AsyncClient(
+                timeout=self.config.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.config.max_connections,
+                    max_keepalive_connections=self.config.max_keepalive_connections,
+                    keepalive_expiry=self.config.keepalive_expiry
+                ),
+                http2=self.config.http2 and HTTP2_AVAILABLE
+            )
+        return self.client
+
+    def current_timeout(self) -> float:
+        """Timeout derived from recent latency, clamped to [min_timeout, timeout]"""
+        if not self.config.adaptive_timeout:
+            return self.config.timeout
+        observed = self.latency.percentile(self.config.timeout_percentile)
+        if observed is None:
+            return self.config.timeout
+        return min(self.config.timeout, max(self.config.min_timeout, observed * (1 + self.config.timeout_margin)))
+
+    async def _send(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """Send a request on the pooled client under the adaptive timeout, recording its latency"""
+        timeout = self.current_timeout()
+        started = time.monotonic()
+        try:
+            response = await asyncio.wait_for(self._get_client().request(method, url, **kwargs), timeout)
+        except asyncio.TimeoutError:
+            # Count the timeout as a slow sample so the adaptive timeout backs off
+            self.latency.record(timeout)
+            self.timeouts += 1
+            raise TimeoutError(f"{self.config.name} timed out after {timeout:.1f}s")
+        elapsed = time.monotonic() - started
+        self.latency.record(elapsed)
+        self.metrics.observe("network", elapsed)
+        self.metrics.record_transfer(len(response.request.content), response.num_bytes_downloaded or len(response.content))
+        return response
+
+    async def _parse(self, html: str) -> Dict[str, Any]:
+        """Parse a page in the worker pool, timing the parse"""
+        started = time.monotonic()
+        parsed = await parse_html_async(html)
+        self.metrics.observe("parse", time.monotonic() - started)
+        return parsed
+
+    async def close(self):
+        """Close the pooled HTTP client and release its sockets"""
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
     async def connect(self) -> bool:
         """Establish connection to the MCP server"""
+        self.connected = await self._connect()
+        return self.connected
+
+    async def _connect(self) -> bool:
+        """Probe the server according to its type"""
         try:
             if self.config.server_type == 'mcp' and MCP_AVAILABLE:
                 # MCP protocol connection
@@ -72,79 +184,190 @@ class MCPServerConnection:
     async def _test_api_connection(self) -> bool:
         """Test HTTP API connection"""
         try:
-            async with httpx.AsyncClient(timeout=self.config.timeout) as client:
-                response = await client.get(self.config.connection_url)
-                return response.status_code < 400
+            response = await self._get_client().get(self.config.connection_url)
+            return response.status_code < 400
         except Exception:
             return False
 
     async def _test_web_connection(self) -> bool:
         """Test web scraping connection"""
         try:
-            async with httpx.AsyncClient(timeout=self.config.timeout) as client:
-                response = await client.get(self.config.connection_url)
-                return response.status_code == 200
+            response = await self._get_client().get(self.config.connection_url)
+            return response.status_code == 200
         except Exception:
             return False
 
-    async def query(self, query: str, params: Optional[Dict] = None) -> Dict[str, Any]:
+    async def query(
+        self,
+        query: str,
+        params: Optional[Dict] = None,
+        priority: int = PRIORITY_INTERACTIVE,
+        user_id: Optional[str] = None
+    ) -> Dict[str, Any]:
         """Query the MCP server"""
-        # Rate limiting
-        current_time = asyncio.get_event_loop().time()
-        if current_time - self.last_request < 60 / self.config.rate_limit:
-            await asyncio.sleep(60 / self.config.rate_limit - (current_time - self.last_request))
+        # Rate limiting (token bucket shared by all concurrent callers, served by priority)
+        waited = await self.rate_limiter.acquire(priority, user_id)
+        self.metrics.observe("rate_limit_wait", waited)
 
         self.last_request = asyncio.get_event_loop().time()
         self.request_count += 1
 
+        started = time.monotonic()
         try:
-            if self.config.server_type == 'api':
-                return await self._query_api(query, params)
-            elif self.config.server_type == 'web_scraping':
-                return await self._query_web_scraping(query, params)
+            if self.config.hedge_requests and self.config.idempotent:
+                result = await self._execute_hedged(query, params)
             else:
-                return {"error": "Unsupported server type"}
+                result = await self._execute(query, params)
         except Exception as e:
             logging.error(f"Query failed for {self.config.name}: {e}")
-            return {"error": str(e)}
+            self.metrics.record_error(classify_error(e))
+            result = {"error": str(e)}
+
+        if self.recorder is not None:
+            self.recorder.record(self.config.name, query, params, result, time.monotonic() - started)
+        return result
+
+    async def _execute(self, query: str, params: Optional[Dict] = None) -> Dict[str, Any]:
+        """Run one attempt of a query"""
+        if self.config.server_type == 'api':
+            return await self._query_api(query, params)
+        elif self.config.server_type == 'web_scraping':
+            return await self._query_web_scraping(query, params)
+        else:
+            return {"error": "Unsupported server type"}
+
+    async def _execute_hedged(self, query: str, params: Optional[Dict] = None) -> Dict[str, Any]:
+        """Run a query, sending a second attempt if the first outlives the hedge percentile.
+
+        The hedge only goes out if the rate limiter has a spare token right now, and
+        whichever attempt succeeds first wins; the other is cancelled.
+        """
+        hedge_delay = self.latency.percentile(self.config.hedge_percentile)
+        if hedge_delay is None:
+            return await self._execute(query, params)
+
+        primary = asyncio.ensure_future(self._execute(query, params))
+        attempts = [primary]
+        try:
+            done, _ = await asyncio.wait(attempts, timeout=hedge_delay)
+            if done or not self.rate_limiter.try_acquire():
+                return await primary
+
+            self.hedged_requests += 1
+            self.request_count += 1
+            hedge = asyncio.ensure_future(self._execute(query, params))
+            attempts.append(hedge)
+
+            pending = set(attempts)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for attempt in done:
+                    if attempt.exception() is None and "error" not in attempt.result():
+                        if attempt is hedge:
+                            self.hedge_wins += 1
+                        return attempt.result()
+            # Both attempts failed: report the primary's outcome
+            return primary.result()
+        finally:
+            for attempt in attempts:
+                attempt.cancel()
 
     async def _query_api(self, query: str, params: Optional[Dict] = None) -> Dict[str, Any]:
         """Query HTTP API"""
-        async with httpx.AsyncClient(timeout=self.config.timeout) as client:
-            response = await client.post(
-                self.config.connection_url,
-                json={"query": query, "params": params},
-                headers=self.config.authentication or {}
-            )
-
-            if response.status_code == 200:
-                return response.json()
-            else:
-                return {"error": f"API returned status {response.status_code}"}
+        response = await self._send(
+            "POST",
+            self.config.connection_url,
+            json={"query": query, "params": params},
+            headers=self.config.authentication or {}
+        )
+
+        if response.status_code == 200:
+            return response.json()
+        else:
+            self.metrics.record_error(f"http_{response.status_code // 100}xx")
+            return {"error": f"API returned status {response.status_code}"}
 
     async def _query_web_scraping(self, query: str, params: Optional[Dict] = None) -> Dict[str, Any]:
-        """Query via web scraping"""
-        async with httpx.AsyncClient(timeout=self.config.timeout) as client:
-            response = await client.get(self.config.connection_url)
-
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.text, 'html.parser')
-                # Extract relevant data based on query
-                return {
-                    "content": soup.get_text(),
-                    "title": soup.title.string if soup.title else "",
-                    "url": self.config.connection_url
-                }
-            else:
+        """Query via web scraping, revalidating the persistent page cache with a conditional GET"""
+        url = self.config.connection_url
+        page = await self.page_cache.get(url) if self.page_cache else None
+
+        response = await self._send("GET", url, headers=page.conditional_headers() if page else None)
+
+        parsed = None
+        if response.status_code == 304 and page is not None:
+            self.page_cache.not_modified += 1
+            parsed = await self._parse_cached_page(page)
+            if parsed is None:
+                # Stored body is gone: fetch the page unconditionally
+                response = await self._send("GET", url)
+
+        if parsed is None:
+            if response.status_code != 200:
+                self.metrics.record_error(f"http_{response.status_code // 100}xx")
                 return {"error": f"Web request failed with status {response.status_code}"}
 
+            # Parse in the worker pool so large pages don't block the event loop
+            parsed = await self._parse(response.text)
+            if self.page_cache:
+                self.page_cache.full_fetches += 1
+                await self.page_cache.put(new_page(url, response.headers, PARSE_FORMAT, parsed), response.text)
+
+        # Return only the passages relevant to the query
+        index = self._get_snippet_index(url, parsed)
+        snippets = index.search(query, int((params or {}).get("top_k", self.config.snippet_top_k)))
+        return {
+            "content": "\n\n".join(snippet["text"] for snippet in snippets),
+            "snippets": snippets,
+            "total_passages": len(index.passages),
+            "title": parsed["title"],
+            "url": url
+        }
+
+    def _get_snippet_index(self, url: str, parsed: Dict[str, Any]) -> SnippetIndex:
+        """Materialize the page's snippet index once per parsed version"""
+        cached = self._snippet_indexes.get(url)
+        if cached is None or cached[0] is not parsed:
+            cached = (parsed, SnippetIndex.from_dict(parsed["index"]))
+            self._snippet_indexes[url] = cached
+        return cached[1]
+
+    async def _parse_cached_page(self, page) -> Optional[Dict[str, Any]]:
+        """Parsed form of a cached page, re-parsing the stored body if the format changed"""
+        if page.parsed is not None and page.parse_format == PARSE_FORMAT:
+            return page.parsed
+
+        body = await self.page_cache.read_body(page.url)
+        if body is None:
+            return None
+
+        page.parsed = await self._parse(body)
+        page.parse_format = PARSE_FORMAT
+        await self.page_cache.update(page)
+        return page.parsed
+
 class MCPManager:
     """Main MCP Manager for handling multiple server connections"""
 
     def __init__(self):
         self.connections: Dict[str, MCPServerConnection] = {}
+        self.cache = ResponseCache(max_entries=int(os.getenv("MCP_CACHE_MAX_ENTRIES", "1024")))
+        self.singleflight = SingleFlight()
+        self.connect_deadline = float(os.getenv("MCP_CONNECT_DEADLINE", "0.8"))  # seconds
+        self._probe_tasks: Dict[str, asyncio.Task] = {}
+        self._connect_future: Optional[asyncio.Future] = None
+        self.loop_monitor = LoopLagMonitor()
+        self.page_cache = PageCache()
+        self.prefetcher = RefreshAheadScheduler(self)
+        self.recorder: Optional[MCPRecorder] = None
+        self.replayer: Optional[MCPReplayer] = None
         self._initialize_servers()
 
+        if REPLAY_PATH:
+            self.start_replay(REPLAY_PATH, REPLAY_LATENCY_SCALE)
+        elif RECORD_PATH:
+            self.start_recording(RECORD_PATH)
+
     def _initialize_servers(self):
         """Initialize connections to known MCP servers"""
 
@@ -153,7 +376,10 @@ class MCPManager:
             name="wa_dor",
             server_type="web_scraping",
             connection_url="https://dor.wa.gov/businesses",
-            rate_limit=5
+            rate_limit=5,
+            burst_size=2,
+            cache_ttl=3600,
+            hedge_requests=True
         ))
 
         # Washington Secretary of State
@@ -161,7 +387,10 @@ class MCPManager:
             name="wa_sos",
             server_type="web_scraping",
             connection_url="https://sos.wa.gov/businesses",
-            rate_limit=5
+            rate_limit=5,
+            burst_size=2,
+            cache_ttl=3600,
+            hedge_requests=True
         ))
 
         # USPTO (United States Patent and Trademark Office)
@@ -169,7 +398,8 @@ class MCPManager:
             name="uspto",
             server_type="api",
             connection_url="https://developer.uspto.gov/api",
-            rate_limit=20
+            rate_limit=20,
+            burst_size=5
         ))
 
         # Grants.gov
@@ -177,7 +407,8 @@ class MCPManager:
             name="grants_gov",
             server_type="api",
             connection_url="https://www.grants.gov/web/grants/search-grants.html",
-            rate_limit=10
+            rate_limit=10,
+            burst_size=3
         ))
 
         # Legal compliance data (placeholder)
@@ -185,7 +416,10 @@ class MCPManager:
             name="legal_us",
             server_type="web_scraping",
             connection_url="https://www.usa.gov/business-laws",
-            rate_limit=15
+            rate_limit=15,
+            burst_size=3,
+            cache_ttl=3600,
+            hedge_requests=True
         ))
 
         # Mock MCP Servers for Startup Formation
@@ -199,7 +433,10 @@ class MCPManager:
             name="irs_ein",
             server_type="api",
             connection_url="http://127.0.0.1:8001/irs",
-            rate_limit=10
+            rate_limit=10,
+            burst_size=5,
+            cache_ttl=0,
+            idempotent=False
         ))
 
         # SAM.gov Mock Server
@@ -207,7 +444,10 @@ class MCPManager:
             name="sam_gov",
             server_type="api",
             connection_url="http://127.0.0.1:8001/sam",
-            rate_limit=5
+            rate_limit=5,
+            burst_size=5,
+            cache_ttl=0,
+            idempotent=False
         ))
 
         # Payroll System Mocks
@@ -215,7 +455,10 @@ class MCPManager:
             name="payroll_mocks",
             server_type="api",
             connection_url="http://127.0.0.1:8001/payroll",
-            rate_limit=15
+            rate_limit=15,
+            burst_size=5,
+            cache_ttl=0,
+            idempotent=False
         ))
 
         # Compliance System Mocks
@@ -223,7 +466,8 @@ class MCPManager:
             name="compliance_mocks",
             server_type="api",
             connection_url="http://127.0.0.1:8001/legal",
-            rate_limit=20
+            rate_limit=20,
+            burst_size=5
         ))
 
         # State Tax Authority Mocks
@@ -231,55 +475,285 @@ class MCPManager:
             name="state_tax_mocks",
             server_type="api",
             connection_url="http://127.0.0.1:8001/tax",
-            rate_limit=10
+            rate_limit=10,
+            burst_size=5,
+            cache_ttl=0,
+            idempotent=False
         ))
 
     def add_server(self, config: MCPServerConfig):
         """Add a new MCP server connection"""
-        self.connections[config.name] = MCPServerConnection(config)
+        self.connections[config.name] = MCPServerConnection(config, page_cache=self.page_cache)
+        self.connections[config.name].recorder = self.recorder
+
+    def start_recording(self, path: str):
+        """Append every upstream and mock-fallback response to a recording file"""
+        self.stop_recording()
+        self.recorder = MCPRecorder(path)
+        for connection in self.connections.values():
+            connection.recorder = self.recorder
+        logger.info(f"Recording MCP traffic to {path}")
+
+    def stop_recording(self):
+        """Stop recording and flush the file"""
+        if self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
+            for connection in self.connections.values():
+                connection.recorder = None
+
+    def start_replay(self, path: str, latency_scale: float = 1.0):
+        """Serve upstream and mock-fallback responses from a recording instead of the network.
+
+        latency_scale multiplies the recorded latencies (0 replays instantly).
+        Rate limits are not applied to replayed requests.
+        """
+        self.replayer = MCPReplayer(path, latency_scale)
+        self.cache.invalidate()
+        for connection in self.connections.values():
+            connection.connected = True
+
+    def stop_replay(self):
+        """Go back to querying the real servers"""
+        self.replayer = None
+        self.cache.invalidate()
+
+    async def connect_all(self, deadline: Optional[float] = None) -> Dict[str, bool]:
+        """Probe all configured servers concurrently under one overall deadline.
+
+        Servers that have not answered when the deadline expires are reported as
+        not connected and keep probing in the background; their state is updated
+        when the probe finishes.
+        """
+        deadline = self.connect_deadline if deadline is None else deadline
 
-    async def connect_all(self) -> Dict[str, bool]:
-        """Connect to all configured servers"""
-        results = {}
         for name, connection in self.connections.items():
-            results[name] = await connection.connect()
-        return results
+            if name not in self._probe_tasks:
+                self._probe_tasks[name] = asyncio.create_task(self._probe(name, connection))
 
-    async def query_server(self, server_name: str, query: str, params: Optional[Dict] = None) -> Dict[str, Any]:
-        """Query a specific server"""
-        if server_name not in self.connections:
-            return {"error": f"Server '{server_name}' not found"}
+        if self._probe_tasks:
+            _, pending = await asyncio.wait(list(self._probe_tasks.values()), timeout=deadline)
+            if pending:
+                stragglers = [name for name, task in self._probe_tasks.items() if task in pending]
+                logger.info(f"MCP connect deadline ({deadline}s) reached, still probing in background: {stragglers}")
 
-        # Try real server first
-        result = await self.connections[server_name].query(query, params)
+        return self.get_connection_results()
 
-        # If real server fails, try mock server as fallback
-        if "error" in result and server_name in mock_mcp_manager.get_available_servers():
+    async def ensure_connected(self) -> Dict[str, bool]:
+        """Connect once per process; concurrent and later callers share the same attempt"""
+        if self._connect_future is None:
+            self._connect_future = asyncio.ensure_future(self.connect_all())
+
+        future = self._connect_future
+        try:
+            await asyncio.shield(future)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # Let the next caller retry instead of replaying the failure forever
+            if self._connect_future is future:
+                self._connect_future = None
+            raise
+
+        return self.get_connection_results()
+
+    async def reconnect(self, server_names: Optional[List[str]] = None) -> Dict[str, bool]:
+        """Explicitly re-probe all servers, or only the named ones"""
+        if server_names is None:
+            self._connect_future = asyncio.ensure_future(self.connect_all())
+            await asyncio.shield(self._connect_future)
+        else:
+            await asyncio.gather(
+                *(self.connections[name].connect() for name in server_names if name in self.connections)
+            )
+
+        return self.get_connection_results()
+
+    def get_connection_results(self) -> Dict[str, bool]:
+        """Current connected/disconnected state of every server"""
+        return {name: connection.connected for name, connection in self.connections.items()}
+
+    async def _probe(self, name: str, connection: MCPServerConnection) -> bool:
+        """Run a single connection probe and forget it once finished"""
+        try:
+            if self.replayer is not None:
+                connection.connected = True
+                return True
+            return await connection.connect()
+        finally:
+            self._probe_tasks.pop(name, None)
+
+    def start_background_tasks(self):
+        """Start background monitors (requires a running event loop)"""
+        self.loop_monitor.start()
+        self.prefetcher.start()
+
+    async def close_all(self):
+        """Close every pooled HTTP client and stop background work (called on application shutdown)"""
+        for task in list(self._probe_tasks.values()):
+            task.cancel()
+
+        await self.loop_monitor.stop()
+        await self.prefetcher.stop()
+        self.stop_recording()
+        await asyncio.gather(
+            *(connection.close() for connection in self.connections.values()),
+            return_exceptions=True
+        )
+        shutdown_parse_executor()
+
+    async def _query_cached(
+        self,
+        server_name: str,
+        query: str,
+        params: Optional[Dict] = None,
+        priority: int = PRIORITY_INTERACTIVE,
+        user_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Query a server through the response cache, coalescing identical in-flight misses.
+
+        Queries to transactional servers (no caching, or not idempotent) skip
+        the cache and are never coalesced: two identical filings are two
+        filings, and a retry after a failed one reaches the upstream again.
+        Errors (including requests rejected by an open circuit) fall back to a
+        stale cached answer or the mock server.
+        """
+        key = make_cache_key(server_name, query, params)
+        metrics = self.connections[server_name].metrics
+        if not self.is_shared(server_name):
+            metrics.record_cache("miss")
+            result = await self._fetch(key, server_name, query, params, priority, user_id)
+            if "error" in result:
+                return await self._fallback(key, server_name, query, params, result)
+            return result
+
+        self.prefetcher.record(key, server_name, query, params)
+        result = self.cache.get(key)
+        if result is not None:
+            metrics.record_cache("negative_hit" if "error" in result else "hit")
+        else:
+            metrics.record_cache("coalesced" if self.singleflight.is_in_flight(key) else "miss")
+            result = await self.singleflight.do(
+                key, lambda: self._fetch(key, server_name, query, params, priority, user_id)
+            )
+
+        if "error" in result:
+            return await self._fallback(key, server_name, query, params, result)
+
+        return result
+
+    def is_shared(self, server_name: str) -> bool:
+        """Whether identical queries to a server may share cached and in-flight answers"""
+        config = self.connections[server_name].config
+        return config.cache_ttl > 0 and config.idempotent
+
+    async def _fetch(
+        self,
+        key,
+        server_name: str,
+        query: str,
+        params: Optional[Dict] = None,
+        priority: int = PRIORITY_INTERACTIVE,
+        user_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Query the upstream server and store the result in the cache"""
+        connection = self.connections[server_name]
+
+        if not connection.circuit_breaker.allow_request():
+            connection.metrics.record_error("circuit_open")
+            return {"error": f"Circuit open for {server_name}", "circuit_open": True}
+
+        started = time.monotonic()
+        try:
+            if self.replayer is not None:
+                result = await self.replayer.replay(server_name, query, params)
+            else:
+                result = await connection.query(query, params, priority, user_id)
+        except BaseException:
+            # Cancelled or crashed without an outcome: never keep a half-open probe slot
+            connection.circuit_breaker.release()
+            raise
+        connection.metrics.observe("upstream", time.monotonic() - started)
+
+        shared = self.is_shared(server_name)
+        if "error" in result:
+            connection.circuit_breaker.record_failure()
+            if shared:
+                self.cache.set(key, result, connection.config.error_cache_ttl, is_error=True)
+        else:
+            connection.circuit_breaker.record_success()
+            if shared:
+                self.cache.set(key, result, connection.config.cache_ttl)
+
+        return result
+
+    async def refresh(self, key, server_name: str, query: str, params: Optional[Dict] = None) -> Dict[str, Any]:
+        """Re-fetch a cached query from upstream ahead of expiry (used by the prefetcher)"""
+        return await self.singleflight.do(
+            key, lambda: self._fetch(key, server_name, query, params, PRIORITY_BACKGROUND, "prefetch")
+        )
+
+    async def _fallback(self, key, server_name: str, query: str, params: Optional[Dict], error: Dict[str, Any]) -> Dict[str, Any]:
+        """Serve a stale cached answer or a mock answer when the real server is unavailable"""
+        metrics = self.connections[server_name].metrics
+        stale = self.cache.get_stale(key) if self.is_shared(server_name) else None
+        if stale is not None:
+            metrics.record_cache("stale")
+            return {**stale, "stale": True}
+
+        if server_name in mock_mcp_manager.get_available_servers():
             logger.info(f"Real server {server_name} failed, trying mock server")
+            metrics.record_cache("mock")
+            if self.replayer is not None:
+                return await self.replayer.replay(server_name, query, params, source="mock")
             try:
-                return await mock_mcp_manager.query_server(server_name, query, params)
+                started = time.monotonic()
+                result = await mock_mcp_manager.query_server(server_name, query, params)
+                if self.recorder is not None:
+                    self.recorder.record(server_name, query, params, result, time.monotonic() - started, source="mock")
+                return result
             except Exception as e:
                 logger.error(f"Mock server {server_name} also failed: {e}")
                 return {"error": f"Both real and mock servers failed for {server_name}"}
 
-        return result
+        return error
 
-    async def query_multiple(self, server_names: List[str], query: str, params: Optional[Dict] = None) -> Dict[str, Any]:
+    async def query_server(
+        self,
+        server_name: str,
+        query: str,
+        params: Optional[Dict] = None,
+        priority: int = PRIORITY_INTERACTIVE,
+        user_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Query a specific server"""
+        if server_name not in self.connections:
+            return {"error": f"Server '{server_name}' not found"}
+
+        return await self._query_cached(server_name, query, params, priority, user_id)
+
+    async def query_multiple(
+        self,
+        server_names: List[str],
+        query: str,
+        params: Optional[Dict] = None,
+        priority: int = PRIORITY_INTERACTIVE,
+        user_id: Optional[str] = None
+    ) -> Dict[str, Any]:
         """Query multiple servers concurrently"""
-        tasks = []
-        for server_name in server_names:
-            if server_name in self.connections:
-                tasks.append(self.connections[server_name].query(query, params))
+        valid_servers = [name for name in server_names if name in self.connections]
 
-        if not tasks:
+        if not valid_servers:
             return {"error": "No valid servers specified"}
 
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        results = await asyncio.gather(
+            *(self._query_cached(name, query, params, priority, user_id) for name in valid_servers),
+            return_exceptions=True
+        )
 
         response = {}
-        for i, server_name in enumerate(server_names):
-            if i < len(results):
-                response[server_name] = results[i] if not isinstance(results[i], Exception) else {"error": str(results[i])}
+        for server_name, result in zip(valid_servers, results):
+            response[server_name] = result if not isinstance(result, Exception) else {"error": str(result)}
 
         return response
 
@@ -288,16 +762,59 @@ class MCPManager:
         status = {}
         for name, connection in self.connections.items():
             status[name] = {
-                "connected": connection.session is not None,
+                "connected": connection.connected,
                 "request_count": connection.request_count,
                 "last_request": connection.last_request,
+                "rate_limiter": connection.rate_limiter.get_status(),
+                "circuit_breaker": connection.circuit_breaker.get_status(),
+                "latency": {
+                    "samples": len(connection.latency),
+                    "p50": connection.latency.percentile(0.5),
+                    "p95": connection.latency.percentile(0.95),
+                    "p99": connection.latency.percentile(0.99),
+                    "current_timeout": round(connection.current_timeout(), 3),
+                    "timeouts": connection.timeouts,
+                    "hedged_requests": connection.hedged_requests,
+                    "hedge_wins": connection.hedge_wins
+                },
+                "metrics": connection.metrics.get_stats(),
                 "config": {
                     "server_type": connection.config.server_type,
                     "rate_limit": connection.config.rate_limit,
-                    "timeout": connection.config.timeout
+                    "burst_size": connection.config.burst_size,
+                    "timeout": connection.config.timeout,
+                    "cache_ttl": connection.config.cache_ttl
                 }
             }
         return status
 
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Get response cache and page cache counters"""
+        return {
+            **self.cache.get_stats(),
+            "page_cache": self.page_cache.get_stats(),
+            "prefetch": self.prefetcher.get_stats()
+        }
+
+    def get_runtime_stats(self) -> Dict[str, Any]:
+        """Get event-loop lag, HTML parse pool and record/replay information"""
+        return {
+            "event_loop_lag": self.loop_monitor.get_stats(),
+            "html_parser": get_parser_info(),
+            "recording": self.recorder.get_stats() if self.recorder else None,
+            "replay": self.replayer.get_stats() if self.replayer else None
+        }
+
+    def get_coalescing_stats(self) -> Dict[str, Any]:
+        """Get single-flight counters (how many callers each upstream request served)"""
+        return self.singleflight.get_stats()
+
+    def get_prometheus_metrics(self) -> str:
+        """Per-server metrics in the Prometheus text format"""
+        return render_prometheus(
+            {name: connection.metrics for name, connection in self.connections.items()},
+            self.loop_monitor
+        )
+
 # Global MCP manager instance
 mcp_manager = MCPManager()
@@ -0,0 +1,271 @@
+"""
+Runtime metrics for the MCP layer
+
+Includes an event-loop lag monitor used to confirm the loop stays responsive
+while CPU-heavy work (e.g. HTML parsing) is happening, and a rolling latency
+window used to derive adaptive timeouts and hedging delays.
+
+Every server also carries a ServerMetrics: HDR-style latency histograms for
+each phase of an upstream request (rate-limit wait, network, parse and the
+whole upstream call), error counts by class, bytes transferred and cache
+outcomes. They are reported on /api/v2/mcp/status and rendered in the
+Prometheus text format for /metrics.
+"""
+
+import asyncio
+import math
+from collections import deque
+from typing import Deque, Dict, Any, List, Optional
+
+import httpx
+
+
+class LoopLagMonitor:
+    """Measures how late the event loop wakes a periodic sleeper"""
+
+    def __init__(self, interval: float = 0.1, history: int = 600):
+        self.interval = interval
+        self._samples: Deque[float] = deque(maxlen=history)
+        self.max_lag = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start sampling on the running loop"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop sampling"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - started - self.interval)
+            self._samples.append(lag)
+            self.max_lag = max(self.max_lag, lag)
+
+    @property
+    def current_lag(self) -> Optional[float]:
+        """Most recent lag sample in seconds"""
+        return self._samples[-1] if self._samples else None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Lag statistics in milliseconds over the recent history"""
+        if not self._samples:
+            return {"running": self._task is not None, "samples": 0}
+
+        ordered = sorted(self._samples)
+        return {
+            "running": self._task is not None,
+            "samples": len(ordered),
+            "current_ms": round(self._samples[-1] * 1000, 2),
+            "avg_ms": round(sum(ordered) / len(ordered) * 1000, 2),
+            "p99_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000, 2),
+            "max_ms": round(self.max_lag * 1000, 2)
+        }
+
+
+class RollingLatency:
+    """Latency samples for the most recent requests to one server"""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self._samples: Deque[float] = deque(maxlen=window)
+        self.min_samples = min_samples
+
+    def record(self, seconds: float):
+        self._samples.append(seconds)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """Latency at the given percentile, or None until enough samples exist"""
+        if len(self._samples) < self.min_samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+
+# HDR-style layout: values (in microseconds) below 2**SUB_BUCKET_BITS are exact,
+# larger values land in one of 2**(SUB_BUCKET_BITS - 1) linear sub-buckets per
+# power of two, i.e. within ~6% of the recorded value.
+SUB_BUCKET_BITS = 5
+SUB_BUCKET_HALF = 1 << (SUB_BUCKET_BITS - 1)
+MAX_TRACKABLE_MICROS = 300_000_000  # 5 minutes; anything slower is clamped
+
+# Bucket bounds (seconds) exported to Prometheus
+PROMETHEUS_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Phases timed for every upstream request
+PHASES = ("rate_limit_wait", "network", "parse", "upstream")
+
+
+def _bucket_index(micros: int) -> int:
+    if micros < (1 << SUB_BUCKET_BITS):
+        return micros
+    magnitude = micros.bit_length() - SUB_BUCKET_BITS
+    return magnitude * SUB_BUCKET_HALF + (micros >> magnitude)
+
+
+def _bucket_upper(index: int) -> int:
+    """Exclusive upper bound, in microseconds, of the values stored in a bucket"""
+    magnitude = max(0, index // SUB_BUCKET_HALF - 1)
+    return (index - magnitude * SUB_BUCKET_HALF + 1) << magnitude
+
+
+class LatencyHistogram:
+    """Fixed-size log-linear histogram; recording is O(1) and allocation-free"""
+
+    def __init__(self):
+        self.counts = [0] * (_bucket_index(MAX_TRACKABLE_MICROS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float):
+        seconds = max(0.0, seconds)
+        self.counts[_bucket_index(min(int(seconds * 1_000_000), MAX_TRACKABLE_MICROS))] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """Upper bound (seconds) of the bucket holding the given percentile"""
+        if not self.count:
+            return None
+        target = max(1, math.ceil(self.count * fraction))
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= target:
+                return min(self.max, _bucket_upper(index) / 1_000_000)
+        return self.max
+
+    def cumulative(self, bounds=PROMETHEUS_BUCKETS) -> List[int]:
+        """Number of samples known to be <= each bound (seconds), for Prometheus export"""
+        result = []
+        seen = 0
+        index = 0
+        for bound in bounds:
+            limit = bound * 1_000_000
+            while index < len(self.counts) and _bucket_upper(index) <= limit:
+                seen += self.counts[index]
+                index += 1
+            result.append(seen)
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Summary in milliseconds"""
+        if not self.count:
+            return {"count": 0}
+
+        def ms(value):
+            return round(value * 1000, 3)
+
+        return {
+            "count": self.count,
+            "mean_ms": ms(self.total / self.count),
+            "p50_ms": ms(self.percentile(0.5)),
+            "p90_ms": ms(self.percentile(0.9)),
+            "p99_ms": ms(self.percentile(0.99)),
+            "p999_ms": ms(self.percentile(0.999)),
+            "max_ms": ms(self.max)
+        }
+
+
+def classify_error(error: BaseException) -> str:
+    """Coarse error class used as a metrics label"""
+    if isinstance(error, (TimeoutError, asyncio.TimeoutError, httpx.TimeoutException)):
+        return "timeout"
+    if isinstance(error, httpx.ConnectError):
+        return "connect"
+    if isinstance(error, httpx.TransportError):
+        return "transport"
+    if isinstance(error, ValueError):
+        return "decode"
+    return "other"
+
+
+class ServerMetrics:
+    """Per-server latency histograms, error classes, bytes transferred and cache outcomes"""
+
+    def __init__(self):
+        self.histograms: Dict[str, LatencyHistogram] = {phase: LatencyHistogram() for phase in PHASES}
+        self.errors: Dict[str, int] = {}
+        self.cache_outcomes: Dict[str, int] = {}
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+    def observe(self, phase: str, seconds: float):
+        self.histograms[phase].record(seconds)
+
+    def record_error(self, error_class: str):
+        self.errors[error_class] = self.errors.get(error_class, 0) + 1
+
+    def record_cache(self, outcome: str):
+        self.cache_outcomes[outcome] = self.cache_outcomes.get(outcome, 0) + 1
+
+    def record_transfer(self, sent: int, received: int):
+        self.bytes_sent += sent
+        self.bytes_received += received
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "latency": {phase: histogram.get_stats() for phase, histogram in self.histograms.items()},
+            "errors": dict(self.errors),
+            "cache": dict(self.cache_outcomes),
+            "bytes_sent": self.bytes_sent,
+            "bytes_received": self.bytes_received
+        }
+
+
+def _labels(**labels) -> str:
+    return "{" + ",".join(f'{name}="{value}"' for name, value in labels.items()) + "}"
+
+
+def render_prometheus(servers: Dict[str, ServerMetrics], loop_lag: Optional[LoopLagMonitor] = None) -> str:
+    """Render server metrics in the Prometheus text exposition format"""
+    lines = [
+        "# HELP mcp_request_duration_seconds Time spent per phase of an upstream MCP request",
+        "# TYPE mcp_request_duration_seconds histogram"
+    ]
+    for server, metrics in servers.items():
+        for phase, histogram in metrics.histograms.items():
+            for bound, count in zip(PROMETHEUS_BUCKETS, histogram.cumulative()):
+                lines.append(f"mcp_request_duration_seconds_bucket{_labels(server=server, phase=phase, le=bound)} {count}")
+            lines.append(f"mcp_request_duration_seconds_bucket{_labels(server=server, phase=phase, le='+Inf')} {histogram.count}")
+            lines.append(f"mcp_request_duration_seconds_sum{_labels(server=server, phase=phase)} {histogram.total}")
+            lines.append(f"mcp_request_duration_seconds_count{_labels(server=server, phase=phase)} {histogram.count}")
+
+    lines += ["# HELP mcp_errors_total Failed upstream MCP requests by error class", "# TYPE mcp_errors_total counter"]
+    for server, metrics in servers.items():
+        for error_class, count in metrics.errors.items():
+            lines.append(f"mcp_errors_total{_labels(server=server, error_class=error_class)} {count}")
+
+    lines += ["# HELP mcp_cache_requests_total MCP queries by cache outcome", "# TYPE mcp_cache_requests_total counter"]
+    for server, metrics in servers.items():
+        for outcome, count in metrics.cache_outcomes.items():
+            lines.append(f"mcp_cache_requests_total{_labels(server=server, outcome=outcome)} {count}")
+
+    lines += ["# HELP mcp_bytes_total Bytes transferred to and from MCP servers", "# TYPE mcp_bytes_total counter"]
+    for server, metrics in servers.items():
+        lines.append(f"mcp_bytes_total{_labels(server=server, direction='sent')} {metrics.bytes_sent}")
+        lines.append(f"mcp_bytes_total{_labels(server=server, direction='received')} {metrics.bytes_received}")
+
+    if loop_lag is not None and loop_lag.current_lag is not None:
+        lines += [
+            "# HELP mcp_event_loop_lag_seconds Most recent event-loop wakeup lag",
+            "# TYPE mcp_event_loop_lag_seconds gauge",
+            f"mcp_event_loop_lag_seconds {loop_lag.current_lag}"
+        ]
+
+    return "\n".join(lines) + "\n"
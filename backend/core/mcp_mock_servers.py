@@ -3,26 +3,273 @@ Mock MCP Servers for Startup Formation Workflow
 
 This module provides mock implementations of various government and legal
 MCP servers for testing and development purposes.
+
+Run it directly to serve the mocks over HTTP on 127.0.0.1:8001 (the URLs the
+irs_ein, sam_gov, payroll_mocks, compliance_mocks and state_tax_mocks servers
+in MCPManager point at):
+
+    python -m core.mcp_mock_servers
+
+Response latency and injected faults are described by a MockBehaviorConfig,
+per server and per endpoint, loaded from the JSON file in MOCK_CONFIG_PATH or
+changed at runtime through /mock-admin/config:
+
+    {
+        "seed": 42,
+        "default": {"latency": {"type": "lognormal", "median": 0.3, "sigma": 0.5}},
+        "servers": {
+            "irs": {
+                "faults": {"error_rate": 0.05},
+                "endpoints": {"/ein": {"latency": {"type": "bimodal", "fast": 0.2, "slow": 4.0, "slow_probability": 0.1}}}
+            }
+        }
+    }
+
+Latency types: constant (seconds), uniform (low, high), lognormal (median,
+sigma), bimodal (fast, slow, slow_probability, sigma) and trace (samples, or
+a path to a file of latencies or an MCP traffic recording). Faults:
+error_rate/error_status, timeout_rate/timeout_seconds, slow_body_rate/
+slow_body_seconds and reset_rate. When a mock is queried in-process rather
+than over HTTP, a slow body is just extra delay and a reset is a
+ConnectionError.
 """
 
 import asyncio
+import gzip
 import json
+import math
+import os
 import random
 import time
-from typing import Dict, Any, List, Optional
+from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime, timedelta
 import logging
 
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from .mock_entity_registry import load_entity_registry
+
 logger = logging.getLogger(__name__)
 
+
+class LatencyModel(ABC):
+    """Distribution of mock response delays"""
+
+    def __init__(self, spec: Dict[str, Any]):
+        self.spec = spec
+
+    @abstractmethod
+    def sample(self, rng: random.Random) -> float:
+        """Draw one response delay in seconds"""
+        pass
+
+
+class ConstantLatency(LatencyModel):
+    def sample(self, rng: random.Random) -> float:
+        return float(self.spec.get("seconds", 0.0))
+
+
+class UniformLatency(LatencyModel):
+    def sample(self, rng: random.Random) -> float:
+        return rng.uniform(self.spec.get("low", 0.5), self.spec.get("high", 2.0))
+
+
+class LognormalLatency(LatencyModel):
+    def sample(self, rng: random.Random) -> float:
+        return rng.lognormvariate(math.log(self.spec.get("median", 0.3)), self.spec.get("sigma", 0.5))
+
+
+class BimodalLatency(LatencyModel):
+    """Mostly fast responses with an occasional slow tail"""
+
+    def sample(self, rng: random.Random) -> float:
+        slow = rng.random() < self.spec.get("slow_probability", 0.05)
+        median = self.spec.get("slow", 2.0) if slow else self.spec.get("fast", 0.1)
+        return rng.lognormvariate(math.log(median), self.spec.get("sigma", 0.25))
+
+
+class TraceLatency(LatencyModel):
+    """Replays recorded latencies in order, wrapping around at the end"""
+
+    def __init__(self, spec: Dict[str, Any]):
+        super().__init__(spec)
+        self.samples = list(spec.get("samples") or _load_trace(spec["path"]))
+        if not self.samples:
+            raise ValueError("Latency trace is empty")
+        self._position = 0
+
+    def sample(self, rng: random.Random) -> float:
+        value = self.samples[self._position % len(self.samples)]
+        self._position += 1
+        return value
+
+
+def _load_trace(path: str) -> List[float]:
+    """Latencies from a file of numbers, one per line, or an MCP traffic recording (JSONL)"""
+    opener = gzip.open if path.endswith(".gz") else open
+    samples = []
+    with opener(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                samples.append(float(json.loads(line)["latency"]) if line.startswith("{") else float(line))
+    return samples
+
+
+LATENCY_MODELS = {
+    "constant": ConstantLatency,
+    "uniform": UniformLatency,
+    "lognormal": LognormalLatency,
+    "bimodal": BimodalLatency,
+    "trace": TraceLatency
+}
+
+# Matches the previous behaviour of a 0.5-2.0s delay, now drawn per request
+DEFAULT_LATENCY = {"type": "uniform", "low": 0.5, "high": 2.0}
+
+
+def build_latency_model(spec: Dict[str, Any]) -> LatencyModel:
+    model = LATENCY_MODELS.get(spec.get("type"))
+    if model is None:
+        raise ValueError(f"Unknown latency type: {spec.get('type')}")
+    return model(spec)
+
+
+@dataclass
+class FaultSpec:
+    """Probabilities of each injected fault (checked in this order)"""
+    error_rate: float = 0.0
+    error_status: int = 503
+    timeout_rate: float = 0.0
+    timeout_seconds: float = 120.0
+    reset_rate: float = 0.0
+    slow_body_rate: float = 0.0
+    slow_body_seconds: float = 5.0
+
+    def choose(self, rng: random.Random) -> Optional[str]:
+        """Pick the fault for one request, or None"""
+        roll = rng.random()
+        for fault, rate in (
+            ("error", self.error_rate),
+            ("timeout", self.timeout_rate),
+            ("reset", self.reset_rate),
+            ("slow_body", self.slow_body_rate)
+        ):
+            if roll < rate:
+                return fault
+            roll -= rate
+        return None
+
+
+@dataclass
+class MockDecision:
+    """How to answer one mock request"""
+    delay: float
+    fault: Optional[str]
+    faults: FaultSpec
+
+
+class MockBehaviorConfig:
+    """Latency models and fault rates per server and endpoint, with seeded randomness.
+
+    Settings resolve endpoint -> server -> default; each (server, endpoint) draws
+    from its own RNG seeded from the global seed, so a run is reproducible
+    regardless of how requests to different endpoints interleave.
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        self.config: Dict[str, Any] = {"seed": 0, "default": {}, "servers": {}}
+        self._resolved: Dict[Tuple[str, str], Tuple[LatencyModel, FaultSpec, random.Random]] = {}
+        self.update(config or {})
+
+    @classmethod
+    def from_env(cls) -> "MockBehaviorConfig":
+        """Load MOCK_CONFIG_PATH, then apply the MOCK_LATENCY / MOCK_ERROR_RATE / MOCK_SEED shortcuts"""
+        behavior = cls()
+        path = os.getenv("MOCK_CONFIG_PATH")
+        if path:
+            with open(path, "r", encoding="utf-8") as f:
+                behavior.update(json.load(f))
+
+        default: Dict[str, Any] = {}
+        if os.getenv("MOCK_LATENCY"):
+            default["latency"] = {"type": "constant", "seconds": float(os.environ["MOCK_LATENCY"])}
+        if os.getenv("MOCK_ERROR_RATE"):
+            default["faults"] = {"error_rate": float(os.environ["MOCK_ERROR_RATE"])}
+        overrides: Dict[str, Any] = {"default": {**behavior.config["default"], **default}} if default else {}
+        if os.getenv("MOCK_SEED"):
+            overrides["seed"] = int(os.environ["MOCK_SEED"])
+        behavior.update(overrides)
+        return behavior
+
+    def update(self, config: Dict[str, Any]):
+        """Apply a partial config: "seed", "default" and each listed server are replaced"""
+        merged = {
+            "seed": config.get("seed", self.config["seed"]),
+            "default": config.get("default", self.config["default"]),
+            "servers": {**self.config["servers"], **config.get("servers", {})}
+        }
+        # Validate everything before swapping it in
+        for settings in [merged["default"], *merged["servers"].values()]:
+            self._validate(settings)
+            for endpoint_settings in settings.get("endpoints", {}).values():
+                self._validate(endpoint_settings)
+
+        self.config = merged
+        self._resolved.clear()
+
+    @staticmethod
+    def _validate(settings: Dict[str, Any]):
+        if "latency" in settings:
+            build_latency_model(settings["latency"])
+        FaultSpec(**settings.get("faults", {}))
+
+    def _resolve(self, server_name: str, endpoint: str) -> Tuple[LatencyModel, FaultSpec, random.Random]:
+        resolved = self._resolved.get((server_name, endpoint))
+        if resolved is None:
+            server = self.config["servers"].get(server_name, {})
+            layers = [self.config["default"], server, server.get("endpoints", {}).get(endpoint, {})]
+
+            latency = DEFAULT_LATENCY
+            faults: Dict[str, Any] = {}
+            for layer in layers:
+                latency = layer.get("latency", latency)
+                faults.update(layer.get("faults", {}))
+
+            rng = random.Random(f"{self.config['seed']}:{server_name}:{endpoint}")
+            resolved = (build_latency_model(latency), FaultSpec(**faults), rng)
+            self._resolved[(server_name, endpoint)] = resolved
+        return resolved
+
+    def decide(self, server_name: str, endpoint: str) -> MockDecision:
+        """Sample the delay and fault for one request"""
+        latency, faults, rng = self._resolve(server_name, endpoint)
+        return MockDecision(delay=max(0.0, latency.sample(rng)), fault=faults.choose(rng), faults=faults)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return self.config
+
 class MockMCPServer:
     """Base class for mock MCP servers"""
 
-    def __init__(self, name: str, base_url: str):
+    # endpoint -> handler method name
+    ENDPOINTS = {
+        "/name-availability": "check_name_availability",
+        "/business-registration": "register_business",
+        "/file-articles": "file_articles",
+        "/tax-accounts": "setup_tax_accounts",
+        "/legal-compliance": "check_legal_compliance"
+    }
+
+    def __init__(self, name: str, base_url: str, behavior: Optional[MockBehaviorConfig] = None):
         self.name = name
         self.base_url = base_url
         self.is_connected = False
-        self.response_delay = random.uniform(0.5, 2.0)  # Simulate network delay
+        self.behavior = behavior or MockBehaviorConfig()  # Simulated latency and faults
 
     async def connect(self) -> bool:
         """Simulate connection to MCP server"""
@@ -42,41 +289,51 @@ class MockMCPServer:
         if not self.is_connected:
             raise ConnectionError(f"{self.name} server not connected")
 
-        await asyncio.sleep(self.response_delay)
+        decision = self.behavior.decide(self.name, endpoint)
+        await asyncio.sleep(decision.delay)
+        if decision.fault == "timeout":
+            await asyncio.sleep(decision.faults.timeout_seconds)
+            raise TimeoutError(f"{self.name} timed out (injected)")
+        if decision.fault == "slow_body":
+            await asyncio.sleep(decision.faults.slow_body_seconds)
+        elif decision.fault is not None:
+            raise ConnectionError(f"{self.name} failed with injected {decision.fault}")
+
+        return await self.handle(endpoint, params)
 
+    async def handle(self, endpoint: str, params: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Answer a request immediately (no simulated latency or faults)"""
         # Route to appropriate handler based on endpoint
-        if endpoint == "/name-availability":
-            return await self.check_name_availability(params)
-        elif endpoint == "/business-registration":
-            return await self.register_business(params)
-        elif endpoint == "/file-articles":
-            return await self.file_articles(params)
-        elif endpoint == "/tax-accounts":
-            return await self.setup_tax_accounts(params)
-        elif endpoint == "/legal-compliance":
-            return await self.check_legal_compliance(params)
-        else:
+        handler = self.ENDPOINTS.get(endpoint)
+        if handler is None:
             return {"error": "Unknown endpoint", "endpoint": endpoint}
+        return await getattr(self, handler)(params or {})
 
     async def check_name_availability(self, params: Dict[str, Any]) -> Dict[str, Any]:
-        """Mock name availability check"""
+        """Mock name availability check against the synthetic entity registry"""
         business_name = params.get("name", "")
         state = params.get("state", "WA")
 
-        # Simulate some names being taken
-        taken_names = ["Apple", "Google", "Microsoft", "Amazon", "Tesla"]
-        name_taken = any(taken_name.lower() in business_name.lower() for taken_name in taken_names)
+        registry = await load_entity_registry()
+        check = registry.check(business_name)
+        alternatives = []
+        if not check["available"]:
+            candidates = [
+                f"{business_name} Technologies",
+                f"{business_name} Solutions",
+                f"{business_name} Innovations",
+                f"{business_name} Group"
+            ]
+            alternatives = [candidate for candidate in candidates if registry.lookup(candidate) is None]
 
         return {
-            "available": not name_taken,
+            "available": check["available"],
             "name": business_name,
             "state": state,
-            "alternatives": [
-                f"{business_name} LLC",
-                f"{business_name} Technologies",
-                f"{business_name} Solutions",
-                f"{business_name} Innovations"
-            ] if name_taken else [],
+            "exact_match": check["exact_match"],
+            "conflicting_name": check["conflicting_name"],
+            "similar_names": check["similar_names"],
+            "alternatives": alternatives,
             "checked_at": datetime.now().isoformat(),
             "server": self.name
         }
@@ -278,13 +535,13 @@ class LegalComplianceServer(MockMCPServer):
 class IRSMockServer(MockMCPServer):
     """Mock IRS MCP Server for EIN applications"""
 
+    ENDPOINTS = {**MockMCPServer.ENDPOINTS, "/ein": "apply_for_ein"}
+
     def __init__(self):
         super().__init__("irs", "https://irs.gov")
 
     async def apply_for_ein(self, params: Dict[str, Any]) -> Dict[str, Any]:
         """Mock EIN application"""
-        await asyncio.sleep(self.response_delay)
-
         return {
             "ein": f"{random.randint(10, 99)}-{random.randint(1000000, 9999999)}",
             "application_method": "Online",
@@ -299,6 +556,48 @@ class IRSMockServer(MockMCPServer):
         }
 
 
+class SAMGovMockServer(MockMCPServer):
+    """Mock SAM.gov MCP Server for federal entity registration"""
+
+    ENDPOINTS = {**MockMCPServer.ENDPOINTS, "/entity-registration": "register_entity"}
+
+    def __init__(self):
+        super().__init__("sam", "https://sam.gov")
+
+    async def register_entity(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Mock SAM.gov entity registration"""
+        return {
+            "uei": "".join(random.choices("ABCDEFGHJKLMNPQRSTUVWXYZ0123456789", k=12)),
+            "cage_code": "".join(random.choices("ABCDEFGHJKLMNPQRSTUVWXYZ0123456789", k=5)),
+            "status": "submitted",
+            "business_name": params.get("business_name", params.get("name", "")),
+            "estimated_activation": (datetime.now() + timedelta(days=10)).strftime("%Y-%m-%d"),
+            "server": self.name
+        }
+
+
+class PayrollMockServer(MockMCPServer):
+    """Mock payroll provider MCP Server"""
+
+    ENDPOINTS = {**MockMCPServer.ENDPOINTS, "/payroll-setup": "setup_payroll"}
+
+    def __init__(self):
+        super().__init__("payroll", "https://payroll.example.com")
+
+    async def setup_payroll(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Mock payroll account setup"""
+        return {
+            "payroll_account_id": f"PAY{random.randint(100000, 999999)}",
+            "pay_schedule": params.get("pay_schedule", "biweekly"),
+            "state_registrations": [
+                "WA Employment Security Department",
+                "WA Labor & Industries"
+            ],
+            "first_payroll_date": (datetime.now() + timedelta(days=14)).strftime("%Y-%m-%d"),
+            "server": self.name
+        }
+
+
 class MCPMockServerManager:
     """Manager for all mock MCP servers"""
 
@@ -307,15 +606,20 @@ class MCPMockServerManager:
             "wa_sos": WashingtonSOSServer(),
             "wa_dor": WashingtonDORServer(),
             "legal_us": LegalComplianceServer(),
-            "irs": IRSMockServer()
+            "irs": IRSMockServer(),
+            "sam": SAMGovMockServer(),
+            "payroll": PayrollMockServer()
         }
         self.connected_servers: List[str] = []
+        self.behavior = MockBehaviorConfig.from_env()
+        for server in self.servers.values():
+            server.behavior = self.behavior
 
     async def connect_all(self) -> Dict[str, bool]:
         """Connect to all available MCP servers"""
         results = {}
 
-        for server_name, server in self.servers.items():
+        async def connect(server_name: str, server: MockMCPServer):
             try:
                 success = await server.connect()
                 results[server_name] = success
@@ -325,6 +629,7 @@ class MCPMockServerManager:
                 logger.error(f"Failed to connect to {server_name}: {e}")
                 results[server_name] = False
 
+        await asyncio.gather(*(connect(name, server) for name, server in self.servers.items()))
         return results
 
     async def disconnect_all(self):
@@ -383,23 +688,164 @@ async def initialize_mock_servers():
     return results
 
 
-if __name__ == "__main__":
-    # Test the mock servers
-    async def test_servers():
+# HTTP front end: route -> (mock server, endpoint used when the request names none)
+MOCK_HTTP_ROUTES = {
+    "irs": ("irs", "/ein"),
+    "sam": ("sam", "/entity-registration"),
+    "payroll": ("payroll", "/payroll-setup"),
+    "legal": ("legal_us", "/legal-compliance"),
+    "tax": ("wa_dor", "/tax-accounts")
+}
+
+
+class InjectedReset(Exception):
+    """Raised mid-response to drop the client connection"""
+
+
+class _SuppressInjectedResets(logging.Filter):
+    def filter(self, record: logging.LogRecord) -> bool:
+        return not (record.exc_info and isinstance(record.exc_info[1], InjectedReset))
+
+
+class MockHTTPStats:
+    """Request counters for the mock HTTP server"""
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.requests: Dict[str, int] = {}
+        self.faults: Dict[str, int] = {}
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "uptime_seconds": round(time.time() - self.started_at, 1),
+            "requests": dict(self.requests),
+            "total_requests": sum(self.requests.values()),
+            "injected_faults": dict(self.faults),
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight
+        }
+
+
+def _slow_body(body: bytes, seconds: float, chunks: int = 10):
+    """Stream body in chunks spread over the given number of seconds"""
+    async def stream():
+        size = max(1, math.ceil(len(body) / chunks))
+        for start in range(0, len(body), size):
+            yield body[start:start + size]
+            await asyncio.sleep(seconds / chunks)
+    return stream()
+
+
+def _reset_body(body: bytes):
+    """Send part of the body, then drop the connection"""
+    async def stream():
+        yield body[:len(body) // 2]
+        raise InjectedReset()
+    return stream()
+
+
+def create_mock_app(manager: MCPMockServerManager = mock_mcp_manager) -> FastAPI:
+    """FastAPI app serving the mock servers over HTTP.
+
+    POST /<route> accepts the MCPManager API body ({"query": ..., "params": ...});
+    the endpoint comes from the URL suffix, params["endpoint"] or the route's default.
+    """
+    stats = MockHTTPStats()
+    logging.getLogger("uvicorn.error").addFilter(_SuppressInjectedResets())
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        # Build the entity registry before serving so no request pays for it
+        await load_entity_registry()
         await initialize_mock_servers()
+        yield
+        await manager.disconnect_all()
 
-        # Test name availability
-        result = await mock_mcp_manager.query_server("wa_sos", "/name-availability", {
-            "name": "Test Business LLC",
-            "state": "WA"
-        })
-        print("Name availability result:", json.dumps(result, indent=2))
+    app = FastAPI(title="Yogabrata Mock MCP Servers", lifespan=lifespan)
 
-        # Test business registration
-        result = await mock_mcp_manager.query_server("wa_dor", "/business-registration", {
-            "business_name": "Test Business LLC",
-            "state": "WA"
-        })
-        print("Business registration result:", json.dumps(result, indent=2))
+    @app.get("/mock-admin/stats")
+    async def mock_stats():
+        return {
+            **stats.get_stats(),
+            "servers": await manager.get_server_status(),
+            "entity_registry": (await load_entity_registry()).get_stats()
+        }
+
+    @app.get("/mock-admin/config")
+    async def get_mock_config():
+        return manager.behavior.to_dict()
 
-    asyncio.run(test_servers())
+    @app.post("/mock-admin/config")
+    async def update_mock_config(request: Dict[str, Any]):
+        """Replace the seed, the default settings or individual servers' settings"""
+        try:
+            manager.behavior.update(request)
+        except (ValueError, TypeError, KeyError, OSError) as e:
+            return JSONResponse({"error": f"Invalid mock config: {e}"}, status_code=400)
+        return manager.behavior.to_dict()
+
+    @app.get("/{route}")
+    async def mock_probe(route: str):
+        if route not in MOCK_HTTP_ROUTES:
+            return JSONResponse({"error": f"Unknown route {route}"}, status_code=404)
+        server_name, endpoint = MOCK_HTTP_ROUTES[route]
+        server = manager.servers[server_name]
+        return {"route": route, "server": server.name, "connected": server.is_connected, "default_endpoint": endpoint}
+
+    @app.post("/{route}")
+    @app.post("/{route}/{endpoint:path}")
+    async def mock_query(route: str, request: Request, endpoint: Optional[str] = None):
+        if route not in MOCK_HTTP_ROUTES:
+            return JSONResponse({"error": f"Unknown route {route}"}, status_code=404)
+
+        stats.requests[route] = stats.requests.get(route, 0) + 1
+        stats.in_flight += 1
+        stats.peak_in_flight = max(stats.peak_in_flight, stats.in_flight)
+        try:
+            body = await request.json() if await request.body() else {}
+            params = body.get("params") or {}
+            server_name, default_endpoint = MOCK_HTTP_ROUTES[route]
+            endpoint = f"/{endpoint}" if endpoint else params.get("endpoint", default_endpoint)
+            server = manager.servers[server_name]
+            if not server.is_connected:
+                return JSONResponse({"error": f"Server {server_name} not connected"}, status_code=503)
+
+            decision = manager.behavior.decide(server.name, endpoint)
+            if decision.fault:
+                stats.faults[decision.fault] = stats.faults.get(decision.fault, 0) + 1
+            await asyncio.sleep(decision.delay)
+
+            if decision.fault == "error":
+                return JSONResponse({"error": "Injected failure"}, status_code=decision.faults.error_status)
+            if decision.fault == "timeout":
+                await asyncio.sleep(decision.faults.timeout_seconds)
+                return JSONResponse({"error": "Injected timeout"}, status_code=504)
+
+            result = await server.handle(endpoint, params)
+            status_code = 404 if result.get("error") == "Unknown endpoint" else 200
+            if decision.fault is None:
+                return JSONResponse(result, status_code=status_code)
+
+            payload = json.dumps(result).encode("utf-8")
+            stream = _reset_body(payload) if decision.fault == "reset" else _slow_body(payload, decision.faults.slow_body_seconds)
+            return StreamingResponse(stream, status_code=status_code, media_type="application/json")
+        finally:
+            stats.in_flight -= 1
+
+    return app
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    logging.basicConfig(level=logging.INFO)
+    uvicorn.run(
+        create_mock_app(),
+        host=os.getenv("MOCK_SERVER_HOST", "127.0.0.1"),
+        port=int(os.getenv("MOCK_SERVER_PORT", "8001")),
+        backlog=4096,
+        access_log=False,
+        log_level="warning"
+    )
@@ -0,0 +1,136 @@
+"""
+Record/replay of MCP traffic
+
+Recording appends every upstream (server, query, params) -> response, with
+its latency, to a JSONL file (gzip-compressed when the path ends in ".gz").
+Replaying serves those responses back with the recorded latency, optionally
+scaled, so agents and workflows can be benchmarked offline and compared
+across commits without depending on live sites or random mock delays.
+
+Responses from the mock fallback servers are recorded too (source "mock"),
+since they contain random identifiers.
+"""
+
+import asyncio
+import copy
+import gzip
+import json
+import logging
+import os
+from collections import deque
+from typing import Deque, Dict, Any, Optional, Tuple
+
+from .mcp_cache import CacheKey, make_cache_key
+
+logger = logging.getLogger(__name__)
+
+RECORD_PATH = os.getenv("MCP_RECORD_PATH")
+REPLAY_PATH = os.getenv("MCP_REPLAY_PATH")
+REPLAY_LATENCY_SCALE = float(os.getenv("MCP_REPLAY_LATENCY_SCALE", "1.0"))
+
+
+def _open(path: str, mode: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+class MCPRecorder:
+    """Appends MCP responses and their latencies to a JSONL file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+        self.records = 0
+
+    def record(
+        self,
+        server_name: str,
+        query: str,
+        params: Optional[Dict],
+        response: Dict[str, Any],
+        latency: float,
+        source: str = "upstream"
+    ):
+        """Append one exchange"""
+        if self._file is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._file = _open(self.path, "a")
+
+        self._file.write(json.dumps({
+            "source": source,
+            "server": server_name,
+            "query": query,
+            "params": params,
+            "latency": round(latency, 6),
+            "response": response
+        }, separators=(",", ":"), default=str) + "\n")
+        self.records += 1
+
+    def close(self):
+        """Flush and close the recording"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"path": self.path, "records": self.records}
+
+
+class MCPReplayer:
+    """Serves recorded MCP responses with their recorded (scaled) latency.
+
+    Repeated requests for the same (server, query, params) get the recorded
+    responses in order; once they run out the last one is repeated.
+    """
+
+    def __init__(self, path: str, latency_scale: float = 1.0):
+        self.path = path
+        self.latency_scale = latency_scale
+        self._responses: Dict[Tuple[str, CacheKey], Deque[Dict[str, Any]]] = {}
+        self.replayed = 0
+        self.misses = 0
+        self._load()
+
+    def _load(self):
+        entries = 0
+        with _open(self.path, "r") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                key = (entry.get("source", "upstream"), make_cache_key(entry["server"], entry["query"], entry["params"]))
+                self._responses.setdefault(key, deque()).append(entry)
+                entries += 1
+        logger.info(f"Loaded {entries} recorded MCP responses from {self.path}")
+
+    async def replay(
+        self,
+        server_name: str,
+        query: str,
+        params: Optional[Dict] = None,
+        source: str = "upstream"
+    ) -> Dict[str, Any]:
+        """Recorded response for a request, after its recorded latency times latency_scale"""
+        recorded = self._responses.get((source, make_cache_key(server_name, query, params)))
+        if not recorded:
+            self.misses += 1
+            return {"error": f"No recorded response for {server_name}: {query}"}
+
+        entry = recorded.popleft() if len(recorded) > 1 else recorded[0]
+        if self.latency_scale > 0:
+            await asyncio.sleep(entry["latency"] * self.latency_scale)
+
+        self.replayed += 1
+        return copy.deepcopy(entry["response"])
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "latency_scale": self.latency_scale,
+            "recorded_requests": len(self._responses),
+            "replayed": self.replayed,
+            "misses": self.misses
+        }
@@ -0,0 +1,312 @@
+"""
+Synthetic business-entity registry for the mock name-availability servers
+
+Holds millions of entity names in compact indexes so name checks stay fast at
+production data sizes:
+
+- a hash index on each name's "distinguishable" key (lowercased, punctuation,
+  spacing, articles, "and"/"&" and entity designators such as LLC or Inc.
+  removed, following the WA SOS rules), which answers exact and
+  not-distinguishable conflicts in O(1);
+- a sorted list of keys, searched with bisect, for prefix lookups (a
+  character trie would need a dict per node, far more memory at this size);
+- MinHash signatures over the trigrams of each name's distinctive words
+  (generic words such as "Consulting" are left out, otherwise every
+  "X Consulting" would look alike), banded for locality-sensitive hashing and
+  stored as sorted 64-bit arrays, for fuzzy "similar name" search. A query
+  only verifies the names that collide with it in some band, so its cost does
+  not grow with the registry; names with trigram Jaccard similarity >= 0.6
+  are found with about 90% probability (>= 0.7: about 99%).
+"""
+
+import asyncio
+import bisect
+import hashlib
+import logging
+import os
+import random
+import re
+import threading
+import unicodedata
+from array import array
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+REGISTRY_PATH = os.getenv("MOCK_REGISTRY_PATH")
+REGISTRY_SIZE = int(os.getenv("MOCK_REGISTRY_SIZE", "20000"))  # synthetic entities when no file is given
+
+DESIGNATORS = frozenset(
+    "llc pllc lllp llp lp inc incorporated corp corporation co company companies ltd limited "
+    "liability professional ps pc".split()
+)
+IGNORED_WORDS = frozenset("the a an and".split())
+GENERIC_WORDS = frozenset(
+    "consulting consultants solutions technologies technology tech software systems services service "
+    "analytics labs ventures partners holdings group enterprises international global design studio "
+    "media marketing logistics construction properties realty foods health wellness fitness legal "
+    "accounting capital investments energy management associates industries network digital".split()
+)
+
+# LSH banding of the MinHash signature: BANDS bands of BAND_ROWS hashes each
+BANDS = 16
+BAND_ROWS = 4
+SIGNATURE_SIZE = BANDS * BAND_ROWS
+
+# Names that have always been taken in the mock servers
+WELL_KNOWN_ENTITIES = ["Apple Inc.", "Google LLC", "Microsoft Corporation", "Amazon, Inc.", "Tesla, Inc."]
+
+_SEPARATORS = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_name(name: str) -> str:
+    """Lowercase ASCII words separated by single spaces"""
+    ascii_name = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode("ascii").lower()
+    ascii_name = ascii_name.replace(".", "").replace("'", "").replace("&", " and ")
+    return " ".join(_SEPARATORS.split(ascii_name)).strip()
+
+
+def name_keys(name: str) -> Tuple[str, str]:
+    """(distinguishable key, distinctive key) of a name.
+
+    The distinguishable key is the one under which two names count as the same
+    entity name; the distinctive key additionally drops generic business words
+    and is used for fuzzy matching.
+    """
+    words = normalize_name(name).split()
+    kept = [word for word in words if word not in DESIGNATORS and word not in IGNORED_WORDS]
+    distinctive = [word for word in kept if word not in GENERIC_WORDS]
+    return "".join(kept or words), "".join(distinctive or kept or words)
+
+
+def distinguishable_key(name: str) -> str:
+    return name_keys(name)[0]
+
+
+def trigrams(key: str) -> set:
+    padded = f"${key}$"
+    if len(padded) < 3:
+        return {padded}
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class EntityRegistry:
+    """Indexed set of registered entity names"""
+
+    def __init__(self):
+        self.names: List[str] = []
+        self._fuzzy_keys: List[str] = []  # padded distinctive keys
+        self._by_key: Dict[str, int] = {}
+        self._sorted_keys: List[str] = []
+        self._sorted_dirty = False
+        self._sizes = array("H")  # distinct trigrams per entity
+        self._bands = [array("Q") for _ in range(BANDS)]  # (band hash << 32) | entity id, sorted lazily
+        self._bands_dirty = False
+        self._gram_hashes: Dict[str, Tuple[int, ...]] = {}
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def add(self, name: str) -> bool:
+        """Register a name; returns False if it is not distinguishable from an existing one"""
+        key, fuzzy_key = name_keys(name)
+        if not key or key in self._by_key:
+            return False
+
+        entity_id = len(self.names)
+        self.names.append(name)
+        self._by_key[key] = entity_id
+        self._sorted_keys.append(key)
+        self._sorted_dirty = True
+        self._fuzzy_keys.append(f"${fuzzy_key}$")
+        grams = trigrams(fuzzy_key)
+        self._sizes.append(len(grams))
+        for band, band_hash in zip(self._bands, self._band_hashes(grams)):
+            band.append(band_hash << 32 | entity_id)
+        self._bands_dirty = True
+        return True
+
+    def _signature(self, grams: set) -> List[int]:
+        """MinHash signature: per hash function, the minimum over the trigrams"""
+        hashes = []
+        for gram in grams:
+            gram_hashes = self._gram_hashes.get(gram)
+            if gram_hashes is None:
+                gram_hashes = tuple(array("I", hashlib.shake_128(gram.encode("utf-8")).digest(SIGNATURE_SIZE * 4)))
+                self._gram_hashes[gram] = gram_hashes
+            hashes.append(gram_hashes)
+        return list(map(min, *hashes)) if len(hashes) > 1 else list(hashes[0])
+
+    def _band_hashes(self, grams: set) -> List[int]:
+        signature = self._signature(grams)
+        return [
+            hash(tuple(signature[band * BAND_ROWS:(band + 1) * BAND_ROWS])) & 0xFFFFFFFF
+            for band in range(BANDS)
+        ]
+
+    def add_many(self, names: Iterable[str]) -> int:
+        """Register names, returning how many were added"""
+        return sum(1 for name in names if self.add(name))
+
+    def load_file(self, path: str) -> int:
+        """Register one name per line (the first column of a CSV also works)"""
+        with open(path, "r", encoding="utf-8") as f:
+            return self.add_many(line.split(",")[0].strip().strip('"') for line in f if line.strip())
+
+    def load_synthetic(self, count: int, seed: int = 0) -> int:
+        """Register count generated names (deterministic for a given seed)"""
+        return self.add_many(synthetic_names(count, seed))
+
+    def lookup(self, name: str) -> Optional[str]:
+        """Registered name that name is not distinguishable from, if any"""
+        entity_id = self._by_key.get(distinguishable_key(name))
+        return self.names[entity_id] if entity_id is not None else None
+
+    def is_registered(self, name: str) -> bool:
+        """True if exactly this name (ignoring case, punctuation and spacing) is registered"""
+        match = self.lookup(name)
+        return match is not None and normalize_name(match) == normalize_name(name)
+
+    def finalize(self):
+        """Sort the prefix and LSH indexes now, so no later query pays for it"""
+        self._sort_keys()
+        self._sort_bands()
+
+    def _sort_keys(self):
+        if self._sorted_dirty:
+            self._sorted_keys.sort()
+            self._sorted_dirty = False
+
+    def _sort_bands(self):
+        if self._bands_dirty:
+            self._bands = [array("Q", sorted(band)) for band in self._bands]
+            self._bands_dirty = False
+
+    def prefix_search(self, prefix: str, limit: int = 10) -> List[str]:
+        """Registered names whose key starts with the key of prefix"""
+        key = "".join(normalize_name(prefix).split())
+        if not key:
+            return []
+        self._sort_keys()
+
+        results = []
+        position = bisect.bisect_left(self._sorted_keys, key)
+        while position < len(self._sorted_keys) and len(results) < limit:
+            candidate = self._sorted_keys[position]
+            if not candidate.startswith(key):
+                break
+            results.append(self.names[self._by_key[candidate]])
+            position += 1
+        return results
+
+    def similar(self, name: str, threshold: float = 0.6, limit: int = 5) -> List[Tuple[str, float]]:
+        """Registered names whose trigram Jaccard similarity to name is at least threshold, best first"""
+        query = trigrams(name_keys(name)[1])
+        if not query:
+            return []
+
+        self._sort_bands()
+
+        # Candidates: names whose signature matches the query's in at least one band
+        candidates = set()
+        for band, band_hash in zip(self._bands, self._band_hashes(query)):
+            position = bisect.bisect_left(band, band_hash << 32)
+            while position < len(band) and band[position] >> 32 == band_hash:
+                candidates.add(band[position] & 0xFFFFFFFF)
+                position += 1
+
+        grams = list(query)
+        min_size, max_size = threshold * len(query), len(query) / threshold
+        scored = []
+        for entity_id in candidates:
+            size = self._sizes[entity_id]
+            if not min_size <= size <= max_size:
+                continue
+            # Substring tests on the padded key are much cheaper than building its trigram set
+            overlap = sum(map(self._fuzzy_keys[entity_id].__contains__, grams))
+            score = overlap / (len(query) + size - overlap)
+            if score >= threshold:
+                scored.append((score, entity_id))
+
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        return [(self.names[entity_id], round(score, 3)) for score, entity_id in scored[:limit]]
+
+    def check(self, name: str, similar_threshold: float = 0.6) -> Dict[str, Any]:
+        """Availability of name: exact match, indistinguishable conflict and similar names"""
+        conflict = self.lookup(name)
+        return {
+            "available": conflict is None,
+            "exact_match": conflict is not None and normalize_name(conflict) == normalize_name(name),
+            "conflicting_name": conflict,
+            "similar_names": [
+                {"name": similar_name, "similarity": score}
+                for similar_name, score in self.similar(name, similar_threshold)
+                if similar_name != conflict
+            ]
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "entities": len(self.names),
+            "distinct_trigrams": len(self._gram_hashes),
+            "lsh_bands": BANDS
+        }
+
+
+_ONSETS = "b c d f g h j k l m n p r s t v w z br cr dr fl gr kl pl pr sk st tr ch sh th qu".split()
+_NUCLEI = "a e i o u y ai ea ee oa ou".split()
+_SYLLABLES = [onset + nucleus for onset in _ONSETS for nucleus in _NUCLEI]
+_ENDINGS = ["", "", "x", "n", "r", "s", "tech", "ly", "io", "ix", "ra", "on"]
+_WORDS = (
+    "Pacific Cascade Evergreen Summit Harbor Rainier Olympic Puget Columbia Northwest Alpine Cedar Salmon "
+    "Blue Green Red Silver Golden Bright Clear Swift True Prime First Modern Urban Coastal Mountain River"
+).split()
+_INDUSTRIES = (
+    "Consulting Solutions Technologies Software Systems Analytics Labs Ventures Partners Holdings Group "
+    "Design Studio Media Marketing Logistics Construction Properties Realty Foods Coffee Bakery Brewing "
+    "Health Wellness Dental Fitness Yoga Legal Accounting Capital Investments Energy Solar Robotics Games"
+).split()
+_DESIGNATIONS = ["LLC", "LLC", "LLC", "Inc.", "Corp.", "Co.", "L.L.C.", "Ltd.", "PLLC", "LLP"]
+
+
+def synthetic_names(count: int, seed: int = 0) -> Iterable[str]:
+    """Plausible company names: invented brand words or place words plus an industry and designator"""
+    rng = random.Random(seed)
+    for _ in range(count):
+        brand = "".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(2, 3))) + rng.choice(_ENDINGS)
+        parts = [brand.capitalize()]
+        if rng.random() < 0.3:
+            parts.insert(0, rng.choice(_WORDS))
+        if rng.random() < 0.8:
+            parts.append(rng.choice(_INDUSTRIES))
+        parts.append(rng.choice(_DESIGNATIONS))
+        yield " ".join(parts)
+
+
+_registry: Optional[EntityRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_entity_registry() -> EntityRegistry:
+    """Shared registry, built on first use from MOCK_REGISTRY_PATH or MOCK_REGISTRY_SIZE synthetic names"""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                registry = EntityRegistry()
+                registry.add_many(WELL_KNOWN_ENTITIES)
+                if REGISTRY_PATH:
+                    added = registry.load_file(REGISTRY_PATH)
+                    logger.info(f"Loaded {added} entity names from {REGISTRY_PATH}")
+                else:
+                    registry.load_synthetic(REGISTRY_SIZE)
+                registry.finalize()
+                _registry = registry
+    return _registry
+
+
+async def load_entity_registry() -> EntityRegistry:
+    """get_entity_registry() for async callers; the first build runs in a worker thread, off the event loop"""
+    if _registry is not None:
+        return _registry
+    return await asyncio.to_thread(get_entity_registry)
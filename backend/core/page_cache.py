@@ -0,0 +1,140 @@
+"""
+Persistent page cache for web-scraping MCP servers
+
+Stores each scraped page on disk together with its ETag / Last-Modified
+validators and its parsed form, so unchanged pages are revalidated with a
+conditional GET (a 304 costs no transfer and no re-parse) and a restarted
+process starts warm instead of re-downloading everything.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+PAGE_CACHE_DIR = os.getenv("MCP_PAGE_CACHE_DIR", ".mcp_page_cache")
+
+
+@dataclass
+class CachedPage:
+    """A scraped page, its HTTP validators and its parsed representation"""
+    url: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    fetched_at: float = 0.0
+    parse_format: Optional[int] = None
+    parsed: Optional[Dict[str, Any]] = None
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """Headers for revalidating this page with a conditional GET"""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class PageCache:
+    """On-disk page store with an in-memory index of page metadata"""
+
+    def __init__(self, directory: str = PAGE_CACHE_DIR):
+        self.directory = Path(directory)
+        self._pages: Dict[str, CachedPage] = {}
+        self.not_modified = 0
+        self.full_fetches = 0
+        self.write_errors = 0
+
+    def _paths(self, url: str):
+        digest = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self.directory / f"{digest}.json", self.directory / f"{digest}.html"
+
+    async def get(self, url: str) -> Optional[CachedPage]:
+        """Return cached metadata for url, loading it from disk on first access"""
+        page = self._pages.get(url)
+        if page is None:
+            page = await asyncio.to_thread(self._read_meta, url)
+            if page is not None:
+                self._pages[url] = page
+        return page
+
+    async def read_body(self, url: str) -> Optional[str]:
+        """Read the stored page body"""
+        return await asyncio.to_thread(self._read_body, url)
+
+    async def put(self, page: CachedPage, body: str):
+        """Store a freshly downloaded page"""
+        self._pages[page.url] = page
+        try:
+            await asyncio.to_thread(self._write, page, body)
+        except OSError as e:
+            self.write_errors += 1
+            logger.warning(f"Failed to persist page cache entry for {page.url}: {e}")
+
+    async def update(self, page: CachedPage):
+        """Persist changed metadata (e.g. a re-parse) without rewriting the body"""
+        self._pages[page.url] = page
+        try:
+            await asyncio.to_thread(self._write, page, None)
+        except OSError as e:
+            self.write_errors += 1
+            logger.warning(f"Failed to persist page cache entry for {page.url}: {e}")
+
+    def _read_meta(self, url: str) -> Optional[CachedPage]:
+        meta_path, _ = self._paths(url)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                return CachedPage(**json.load(f))
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def _read_body(self, url: str) -> Optional[str]:
+        _, body_path = self._paths(url)
+        try:
+            return body_path.read_text(encoding="utf-8")
+        except OSError:
+            return None
+
+    def _write(self, page: CachedPage, body: Optional[str]):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        meta_path, body_path = self._paths(page.url)
+
+        # Write to temp files and rename so readers never see a partial entry
+        if body is not None:
+            tmp_body = body_path.with_suffix(".html.tmp")
+            tmp_body.write_text(body, encoding="utf-8")
+            os.replace(tmp_body, body_path)
+
+        tmp_meta = meta_path.with_suffix(".json.tmp")
+        with open(tmp_meta, "w", encoding="utf-8") as f:
+            json.dump(asdict(page), f)
+        os.replace(tmp_meta, meta_path)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get page cache counters"""
+        return {
+            "directory": str(self.directory),
+            "pages": len(self._pages),
+            "not_modified": self.not_modified,
+            "full_fetches": self.full_fetches,
+            "write_errors": self.write_errors
+        }
+
+
+def new_page(url: str, headers, parse_format: int, parsed: Dict[str, Any]) -> CachedPage:
+    """Build a CachedPage from a 200 response's headers"""
+    return CachedPage(
+        url=url,
+        etag=headers.get("etag"),
+        last_modified=headers.get("last-modified"),
+        fetched_at=time.time(),
+        parse_format=parse_format,
+        parsed=parsed
+    )
@@ -0,0 +1,181 @@
+"""
+Refresh-ahead prefetching for hot MCP queries
+
+Tracks how often each cached (server, query, params) is requested, with
+exponential decay so popularity follows recent traffic. A background loop
+re-fetches the most popular entries shortly before their TTL expires, so user
+requests almost never see a cold upstream fetch. Only keys that are still
+being requested (decayed score of at least min_score) are kept warm; once
+traffic stops they are forgotten and left to expire.
+
+Refreshes are paced per server by a dedicated token bucket holding a fraction
+of the server's rate_limit, and are only issued when no user request is
+waiting on that server's limiter, so refresh traffic is spread out evenly and
+never takes quota from interactive callers.
+"""
+
+import asyncio
+import heapq
+import logging
+import math
+import os
+import time
+from typing import Dict, Any, Optional, Set, Tuple, TYPE_CHECKING
+
+from .mcp_cache import CacheKey
+from .rate_limiter import TokenBucket
+
+if TYPE_CHECKING:
+    from .mcp_manager import MCPManager
+
+logger = logging.getLogger(__name__)
+
+
+class RefreshAheadScheduler:
+    """Background refresher for the most popular cached queries"""
+
+    def __init__(
+        self,
+        manager: "MCPManager",
+        top_n: int = int(os.getenv("MCP_PREFETCH_TOP_N", "20")),
+        min_score: float = float(os.getenv("MCP_PREFETCH_MIN_SCORE", "0.5")),
+        refresh_ahead: float = 0.2,
+        interval: float = 5.0,
+        budget_fraction: float = 0.25,
+        popularity_half_life: float = 600.0,
+        max_tracked: int = 1000
+    ):
+        self.manager = manager
+        self.top_n = top_n
+        self.min_score = min_score  # 0.5 = about one request within the last half-life
+        self.refresh_ahead = refresh_ahead  # refresh once less than this fraction of the TTL is left
+        self.interval = interval
+        self.budget_fraction = budget_fraction  # share of each server's rate_limit refreshes may use
+        self.decay_rate = math.log(2) / popularity_half_life
+        self.max_tracked = max_tracked
+
+        # key -> (decayed score, last update, (server, query, params))
+        self._popularity: Dict[CacheKey, Tuple[float, float, Tuple[str, str, Optional[Dict]]]] = {}
+        self._budgets: Dict[str, TokenBucket] = {}
+        self._refreshing: Set[asyncio.Task] = set()
+        self._task: Optional[asyncio.Task] = None
+
+        self.refreshes = 0
+        self.refresh_errors = 0
+        self.skipped_for_budget = 0
+
+    def record(self, key: CacheKey, server_name: str, query: str, params: Optional[Dict] = None):
+        """Count one request for key"""
+        now = time.monotonic()
+        entry = self._popularity.get(key)
+        score = self._decayed(entry, now) + 1.0 if entry else 1.0
+        self._popularity[key] = (score, now, (server_name, query, params))
+
+        if len(self._popularity) > self.max_tracked:
+            self._prune(now)
+
+    def _decayed(self, entry, now: float) -> float:
+        score, updated, _ = entry
+        return score * math.exp(-self.decay_rate * (now - updated))
+
+    def _prune(self, now: float):
+        """Forget the least popular half of the tracked keys"""
+        keep = heapq.nlargest(
+            self.max_tracked // 2,
+            self._popularity.items(),
+            key=lambda item: self._decayed(item[1], now)
+        )
+        self._popularity = dict(keep)
+
+    def start(self):
+        """Start the refresh loop on the running event loop"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the refresh loop and any refreshes in progress"""
+        tasks = list(self._refreshing)
+        if self._task is not None:
+            tasks.append(self._task)
+            self._task = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                self.refresh_due()
+            except Exception as e:
+                logger.error(f"Refresh-ahead scan failed: {e}")
+
+    def refresh_due(self):
+        """Start refreshes for hot entries that are close to expiry"""
+        now = time.monotonic()
+        scores = {key: self._decayed(entry, now) for key, entry in self._popularity.items()}
+
+        # Forget keys nobody asks for any more, so they stop being refreshed
+        for key in [key for key, score in scores.items() if score < self.min_score]:
+            del self._popularity[key]
+            del scores[key]
+
+        hottest = heapq.nlargest(self.top_n, scores, key=scores.get)
+
+        due = []
+        for key in hottest:
+            request = self._popularity[key][2]
+            connection = self.manager.connections.get(request[0])
+            if connection is None or connection.config.cache_ttl <= 0:
+                continue
+            remaining = self.manager.cache.ttl_remaining(key)
+            # Entries that expired before the previous scan are left for the next request to fetch
+            if remaining is None or remaining < -self.interval:
+                continue
+            if remaining < connection.config.cache_ttl * self.refresh_ahead:
+                due.append((remaining, key, request, connection))
+
+        # Most urgent first
+        for remaining, key, request, connection in sorted(due, key=lambda item: item[0]):
+            if self.manager.singleflight.is_in_flight(key):
+                continue
+            # Never compete with user requests already queued on this server's limiter
+            if connection.rate_limiter.queue_depth or connection.rate_limiter.tokens < 1:
+                self.skipped_for_budget += 1
+                continue
+            if not self._budget(connection).try_acquire():
+                self.skipped_for_budget += 1
+                continue
+
+            task = asyncio.create_task(self._refresh(key, *request))
+            self._refreshing.add(task)
+            task.add_done_callback(self._refreshing.discard)
+
+    def _budget(self, connection) -> TokenBucket:
+        """Per-server refresh allowance (a fraction of its rate_limit)"""
+        bucket = self._budgets.get(connection.config.name)
+        if bucket is None:
+            bucket = TokenBucket(connection.config.rate_limit * self.budget_fraction, burst_size=1)
+            self._budgets[connection.config.name] = bucket
+        return bucket
+
+    async def _refresh(self, key: CacheKey, server_name: str, query: str, params: Optional[Dict]):
+        try:
+            result = await self.manager.refresh(key, server_name, query, params)
+            self.refreshes += 1
+            if "error" in result:
+                self.refresh_errors += 1
+        except Exception as e:
+            self.refresh_errors += 1
+            logger.warning(f"Refresh-ahead failed for {server_name}: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get prefetcher counters"""
+        return {
+            "running": self._task is not None,
+            "tracked_queries": len(self._popularity),
+            "refreshes": self.refreshes,
+            "refresh_errors": self.refresh_errors,
+            "skipped_for_budget": self.skipped_for_budget,
+            "in_progress": len(self._refreshing)
+        }
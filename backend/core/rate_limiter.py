@@ -0,0 +1,197 @@
+"""
+Token-bucket rate limiting for MCP server connections
+
+Each upstream server gets one bucket shared by every coroutine that queries it.
+Tokens refill continuously at the configured requests-per-minute rate up to a
+burst capacity; callers that find the bucket empty queue up and are woken by a
+single timer instead of each sleeping independently.
+
+Queued callers are served by priority with weighted fair sharing: every
+priority class gets a share of tokens proportional to its weight (stride
+scheduling), and within a class users take turns round-robin, FIFO per user.
+Interactive requests therefore keep flowing while batch workflows and
+background refreshes use the leftover capacity.
+"""
+
+import asyncio
+import time
+from collections import deque, OrderedDict
+from typing import Deque, Dict, Any, Optional
+
+# Request priorities (lower number = more urgent)
+PRIORITY_INTERACTIVE = 1
+PRIORITY_WORKFLOW = 2
+PRIORITY_BACKGROUND = 3
+
+# Relative share of tokens each priority receives while several are queued
+PRIORITY_WEIGHTS = {
+    PRIORITY_INTERACTIVE: 8,
+    PRIORITY_WORKFLOW: 2,
+    PRIORITY_BACKGROUND: 1
+}
+
+
+def priority_weight(priority: int) -> int:
+    """Scheduling weight for a priority; anything more urgent than interactive counts as interactive"""
+    if priority <= PRIORITY_INTERACTIVE:
+        return PRIORITY_WEIGHTS[PRIORITY_INTERACTIVE]
+    return PRIORITY_WEIGHTS.get(priority, 1)
+
+
+class _PriorityClass:
+    """Waiters of one priority, queued per user"""
+
+    def __init__(self, weight: int):
+        self.weight = weight
+        self.pass_value = 0.0  # stride-scheduling virtual time
+        self.users: "OrderedDict[str, Deque[asyncio.Future]]" = OrderedDict()
+
+    def pop(self) -> Optional[asyncio.Future]:
+        """Next live waiter, rotating round-robin across users"""
+        while self.users:
+            user_id, waiters = next(iter(self.users.items()))
+            waiter = waiters.popleft()
+            if waiters:
+                self.users.move_to_end(user_id)
+            else:
+                del self.users[user_id]
+            if not waiter.done():
+                return waiter
+        return None
+
+    def depth(self) -> int:
+        return sum(1 for waiters in self.users.values() for waiter in waiters if not waiter.done())
+
+
+class TokenBucket:
+    """Concurrency-safe token bucket with priority-aware fair wakeups"""
+
+    def __init__(self, rate_per_minute: float, burst_size: int = 1):
+        self.rate = max(rate_per_minute, 1e-9) / 60.0  # tokens per second
+        self.capacity = max(1, burst_size)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._classes: Dict[int, _PriorityClass] = {}
+        self._queued = 0  # waiters in the queues, including cancelled ones not yet skipped
+        self._virtual_time = 0.0
+        self._wakeup: Optional[asyncio.TimerHandle] = None
+
+    def _refill(self):
+        """Add the tokens accrued since the last update"""
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    @property
+    def tokens(self) -> float:
+        """Tokens currently available"""
+        self._refill()
+        return self._tokens
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of callers waiting for a token"""
+        return sum(priority_class.depth() for priority_class in self._classes.values())
+
+    def try_acquire(self) -> bool:
+        """Take a token only if one is free right now and nobody is queued"""
+        self._refill()
+        if not self._queued and self._tokens >= 1:
+            self._tokens -= 1
+            return True
+        return False
+
+    async def acquire(self, priority: int = PRIORITY_INTERACTIVE, user_id: Optional[str] = None) -> float:
+        """Take one token, queueing by priority and user if none is available.
+
+        Returns the number of seconds spent waiting.
+        """
+        self._refill()
+        if not self._queued and self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        waiter = loop.create_future()
+        self._enqueue(waiter, priority, user_id or "anonymous")
+        self._schedule_wakeup(loop)
+
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Token was granted after the caller gave up: hand it to the next waiter
+                self._tokens = min(self.capacity, self._tokens + 1)
+                self._dispatch()
+            raise
+
+        return loop.time() - started
+
+    def _enqueue(self, waiter: asyncio.Future, priority: int, user_id: str):
+        priority_class = self._classes.get(priority)
+        if priority_class is None:
+            priority_class = self._classes[priority] = _PriorityClass(priority_weight(priority))
+
+        if not priority_class.users:
+            # A class that was idle must not bank credit from the time it had nothing queued
+            priority_class.pass_value = max(priority_class.pass_value, self._virtual_time)
+
+        priority_class.users.setdefault(user_id, deque()).append(waiter)
+        self._queued += 1
+
+    def _next_waiter(self) -> Optional[asyncio.Future]:
+        """Pop the next live waiter from the class that is furthest behind its fair share"""
+        while True:
+            active = [priority_class for priority_class in self._classes.values() if priority_class.users]
+            if not active:
+                return None
+
+            # Lowest virtual finish time (pass + stride) wins, so heavier classes win ties
+            priority_class = min(active, key=lambda candidate: candidate.pass_value + 1.0 / candidate.weight)
+            waiter = priority_class.pop()
+            if waiter is None:
+                # Only cancelled waiters were left in this class
+                continue
+
+            self._virtual_time = priority_class.pass_value
+            priority_class.pass_value += 1.0 / priority_class.weight
+            return waiter
+
+    def _dispatch(self):
+        """Grant available tokens to queued callers"""
+        self._wakeup = None
+        self._refill()
+
+        while self._tokens >= 1:
+            waiter = self._next_waiter()
+            if waiter is None:
+                break
+            self._tokens -= 1
+            waiter.set_result(None)
+
+        self._queued = sum(
+            len(waiters) for priority_class in self._classes.values() for waiters in priority_class.users.values()
+        )
+        if self._queued:
+            self._schedule_wakeup(asyncio.get_running_loop())
+
+    def _schedule_wakeup(self, loop: asyncio.AbstractEventLoop):
+        """Arm the single shared timer for when the next token becomes available"""
+        if self._wakeup is not None:
+            return
+        delay = max(0.0, 1 - self._tokens) / self.rate
+        self._wakeup = loop.call_later(delay, self._dispatch)
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get current bucket state"""
+        return {
+            "tokens": round(self.tokens, 3),
+            "capacity": self.capacity,
+            "queue_depth": self.queue_depth,
+            "queue_depth_by_priority": {
+                priority: priority_class.depth()
+                for priority, priority_class in sorted(self._classes.items())
+                if priority_class.users
+            }
+        }
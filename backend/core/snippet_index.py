@@ -0,0 +1,129 @@
+"""
+Query-aware snippet extraction for scraped pages
+
+Scraped page text is split once into passages and indexed with an inverted
+index; each query is then answered with the top-k passages by BM25 score
+(plus their character offsets in the extracted page text) instead of the
+entire page.
+"""
+
+import heapq
+import math
+import re
+from collections import Counter
+from typing import Dict, Any, List, Tuple
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+LINE_PATTERN = re.compile(r"[^\n]*\S[^\n]*")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have how in is it its of on or that the this to was "
+    "were will with what when where which who your you can do does my our".split()
+)
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens with stopwords removed"""
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+
+def split_passages(text: str, min_chars: int = 80, max_chars: int = 600) -> List[Dict[str, Any]]:
+    """Group the non-empty lines of text into passages of roughly min..max characters.
+
+    A passage ends at a blank line once it has at least min_chars, or as soon
+    as it reaches max_chars. Offsets refer to positions in text.
+    """
+    passages = []
+    lines: List[str] = []
+    start = end = 0
+    length = 0
+
+    def flush():
+        if lines:
+            passages.append({
+                "text": WHITESPACE_PATTERN.sub(" ", " ".join(lines)).strip(),
+                "start": start,
+                "end": end
+            })
+
+    for match in LINE_PATTERN.finditer(text):
+        gap = text.count("\n", end, match.start()) if lines else 0
+        if lines and ((gap > 1 and length >= min_chars) or length >= max_chars):
+            flush()
+            lines, length = [], 0
+
+        if not lines:
+            start = match.start()
+        line = match.group().strip()
+        lines.append(line)
+        length += len(line) + 1
+        end = match.end()
+
+    flush()
+    return passages
+
+
+class SnippetIndex:
+    """Inverted index over a page's passages with BM25 ranking"""
+
+    def __init__(self, passages: List[Dict[str, Any]], postings: Dict[str, List[Tuple[int, int]]], lengths: List[int]):
+        self.passages = passages
+        self.postings = postings  # term -> [(passage id, term frequency)]
+        self.lengths = lengths
+        self.avg_length = (sum(lengths) / len(lengths)) if lengths else 0.0
+
+    @classmethod
+    def build(cls, passages: List[Dict[str, Any]]) -> "SnippetIndex":
+        """Index a list of passages"""
+        postings: Dict[str, List[Tuple[int, int]]] = {}
+        lengths = []
+        for passage_id, passage in enumerate(passages):
+            tokens = tokenize(passage["text"])
+            lengths.append(len(tokens))
+            for term, frequency in Counter(tokens).items():
+                postings.setdefault(term, []).append((passage_id, frequency))
+        return cls(passages, postings, lengths)
+
+    def search(self, query: str, k: int = 5) -> List[Dict[str, Any]]:
+        """Top-k passages for query, best first; passages with no matching term are omitted"""
+        total = len(self.passages)
+        if not total or k <= 0:
+            return []
+
+        scores: Dict[int, float] = {}
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (total - len(postings) + 0.5) / (len(postings) + 0.5))
+            for passage_id, frequency in postings:
+                norm = K1 * (1 - B + B * self.lengths[passage_id] / self.avg_length) if self.avg_length else K1
+                scores[passage_id] = scores.get(passage_id, 0.0) + idf * frequency * (K1 + 1) / (frequency + norm)
+
+        best = heapq.nlargest(k, scores.items(), key=lambda item: (item[1], -item[0]))
+        return [
+            {**self.passages[passage_id], "score": round(score, 4)}
+            for passage_id, score in best
+        ]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serializable form (for the page cache)"""
+        return {
+            "passages": self.passages,
+            "postings": self.postings,
+            "lengths": self.lengths
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SnippetIndex":
+        """Rebuild an index produced by to_dict()"""
+        return cls(
+            data["passages"],
+            {term: [tuple(posting) for posting in postings] for term, postings in data["postings"].items()},
+            data["lengths"]
+        )
@@ -0,0 +1,183 @@
+"""
+Bounded executor for background workflows
+
+Workflows are admitted into a bounded queue and run by a fixed pool of
+worker tasks, so a burst of requests cannot start an unbounded number of
+workflows at once (which would also swamp the MCP rate limiters). When the
+queue is full, submit() raises WorkflowQueueFull and the API answers 429.
+Steps of all workflows additionally share a global concurrency limit
+(step_slot), on top of each workflow's own cap.
+
+The executor holds references to everything it runs, so no workflow task is
+garbage-collected mid-flight, and drain() lets running and queued workflows
+finish on shutdown before cancelling whatever is left.
+"""
+
+import asyncio
+import logging
+import os
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, Dict, Any, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+MAX_CONCURRENT_WORKFLOWS = int(os.getenv("WORKFLOW_MAX_CONCURRENT", "16"))
+MAX_CONCURRENT_STEPS = int(os.getenv("WORKFLOW_MAX_CONCURRENT_STEPS", "32"))
+ADMISSION_QUEUE_SIZE = int(os.getenv("WORKFLOW_QUEUE_SIZE", "256"))
+DRAIN_TIMEOUT = float(os.getenv("WORKFLOW_DRAIN_TIMEOUT", "30"))
+
+
+class WorkflowQueueFull(Exception):
+    """The admission queue is full; the caller should retry later"""
+
+
+class WorkflowExecutor:
+    """Runs workflows on a fixed pool of workers fed by a bounded admission queue"""
+
+    def __init__(
+        self,
+        max_workflows: int = MAX_CONCURRENT_WORKFLOWS,
+        max_steps: int = MAX_CONCURRENT_STEPS,
+        queue_size: int = ADMISSION_QUEUE_SIZE
+    ):
+        self.max_workflows = max(1, max_workflows)
+        self.max_steps = max(1, max_steps)
+        self.queue_size = max(1, queue_size)
+        self._queue: Optional[asyncio.Queue] = None
+        self._steps: Optional[asyncio.Semaphore] = None
+        self.steps_running = 0
+        self._workers: Set[asyncio.Task] = set()
+        self._running: Dict[str, asyncio.Task] = {}
+        self._queued: Set[str] = set()  # admitted, not yet picked up by a worker
+        self.accepting = True
+        self.submitted = 0
+        self.rejected = 0
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+
+    def _start(self):
+        """Create the queue and workers on the running loop"""
+        if self._queue is None:
+            self._queue = asyncio.Queue()  # bounded by submit()
+        while len(self._workers) < self.max_workflows:
+            worker = asyncio.create_task(self._worker())
+            self._workers.add(worker)
+            worker.add_done_callback(self._workers.discard)
+
+    def submit(self, workflow_id: str, run: Callable[[], Awaitable[Any]]) -> str:
+        """Admit a workflow; returns "running" if a worker is free, otherwise "queued".
+
+        run is called by a worker to create the workflow coroutine. Raises
+        WorkflowQueueFull when every worker is busy and the queue is full, and
+        RuntimeError once the executor is draining.
+        """
+        if not self.accepting:
+            raise RuntimeError("Workflow executor is shutting down")
+        self._start()
+
+        free_workers = self.max_workflows - len(self._running)
+        if len(self._queued) >= free_workers + self.queue_size:
+            self.rejected += 1
+            raise WorkflowQueueFull(
+                f"Workflow queue is full ({self.max_workflows} running, {self.queue_size} queued)"
+            )
+
+        status = "running" if len(self._queued) < free_workers else "queued"
+        self._queue.put_nowait((workflow_id, run))
+        self._queued.add(workflow_id)
+        self.submitted += 1
+        return status
+
+    async def _worker(self):
+        while True:
+            workflow_id, run = await self._queue.get()
+            self._queued.discard(workflow_id)
+            task = asyncio.ensure_future(run())
+            self._running[workflow_id] = task
+            try:
+                # wait() rather than await, so cancel() stopping the workflow does not stop the worker
+                await asyncio.wait({task})
+            except asyncio.CancelledError:
+                task.cancel()
+                raise
+            finally:
+                del self._running[workflow_id]
+                self._queue.task_done()
+                if task.done():
+                    self._record_outcome(workflow_id, task)
+                else:
+                    self.cancelled += 1
+
+    def _record_outcome(self, workflow_id: str, task: asyncio.Task):
+        if task.cancelled():
+            self.cancelled += 1
+        elif task.exception() is not None:
+            self.failed += 1
+            logger.error(f"Workflow {workflow_id} crashed: {task.exception()}")
+        else:
+            self.completed += 1
+
+    @asynccontextmanager
+    async def step_slot(self):
+        """Hold one of the global step slots while a workflow step executes"""
+        if self._steps is None:
+            self._steps = asyncio.Semaphore(self.max_steps)
+        async with self._steps:
+            self.steps_running += 1
+            try:
+                yield
+            finally:
+                self.steps_running -= 1
+
+    def is_running(self, workflow_id: str) -> bool:
+        return workflow_id in self._running
+
+    def is_queued(self, workflow_id: str) -> bool:
+        return workflow_id in self._queued
+
+    def cancel(self, workflow_id: str) -> bool:
+        """Cancel a running workflow; returns whether one was running"""
+        task = self._running.get(workflow_id)
+        if task is None:
+            return False
+        task.cancel()
+        return True
+
+    async def drain(self, timeout: float = DRAIN_TIMEOUT):
+        """Stop admitting workflows, let admitted ones finish for up to timeout seconds, then cancel the rest"""
+        self.accepting = False
+        if self._queue is None:
+            return
+
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(
+                f"Workflow drain timed out after {timeout}s; cancelling "
+                f"{len(self._running)} running and {len(self._queued)} queued workflows"
+            )
+
+        for worker in list(self._workers):
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "accepting": self.accepting,
+            "max_workflows": self.max_workflows,
+            "max_steps": self.max_steps,
+            "queue_size": self.queue_size,
+            "running": len(self._running),
+            "queued": len(self._queued),
+            "steps_running": self.steps_running,
+            "submitted": self.submitted,
+            "rejected": self.rejected,
+            "completed": self.completed,
+            "failed": self.failed,
+            "cancelled": self.cancelled
+        }
+
+
+# Global executor instance
+workflow_executor = WorkflowExecutor()
@@ -0,0 +1,298 @@
+"""
+Write-behind persistence of workflow state
+
+Workflow and step transitions only mark a workflow dirty; a background
+flusher snapshots every dirty workflow (on the event loop, so it sees a
+consistent state) and writes them in one transaction every
+WORKFLOW_FLUSH_INTERVAL_MS, in a worker thread. A workflow that changes ten
+times between flushes is written once, and no step transition waits on a
+database commit. If a commit fails the snapshots stay dirty and are retried
+on the next flush.
+
+Each process claims the unfinished workflows it runs with a lease
+(WORKFLOW_LEASE_SECONDS) and renews it while they run. At startup a process
+only resumes workflows whose lease is missing or expired, so several
+uvicorn workers, or a restarted one, never run the same workflow twice.
+Writes only apply to rows this process owns (or nobody does); if another
+process has taken a workflow over, e.g. after this one's lease lapsed during
+a database outage, the write is dropped and on_lease_lost is called so the
+local run stops.
+"""
+
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Any, List, Optional, Set
+
+from sqlalchemy import or_
+
+from .database import SessionLocal, WorkflowRecord
+
+logger = logging.getLogger(__name__)
+
+FLUSH_INTERVAL = int(os.getenv("WORKFLOW_FLUSH_INTERVAL_MS", "200")) / 1000
+LEASE_SECONDS = float(os.getenv("WORKFLOW_LEASE_SECONDS", "60"))
+
+# Workflow statuses that still need to run
+UNFINISHED_STATUSES = ("pending", "in_progress")
+
+Snapshot = Callable[[], Dict[str, Any]]
+
+
+class WorkflowStore:
+    """Coalescing write-behind buffer in front of the workflows table"""
+
+    def __init__(self, flush_interval: float = FLUSH_INTERVAL, lease_seconds: float = LEASE_SECONDS):
+        self.flush_interval = flush_interval
+        self.lease_seconds = lease_seconds
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._dirty: Dict[str, Snapshot] = {}
+        self._owned: Set[str] = set()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._stopping = False
+        self._lease_renewed = datetime.utcnow()
+        self._failing = False
+        self.on_lease_lost: Optional[Callable[[str], None]] = None  # called with the id of a workflow taken over elsewhere
+        self.flushes = 0
+        self.rows_written = 0
+        self.saves = 0
+        self.errors = 0
+        self.leases_lost = 0
+
+    def start(self):
+        """Start the background flusher on the running loop"""
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        self._stopping = False
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the flusher, write everything still buffered and release this process's leases"""
+        if self._task is not None:
+            self._stopping = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        await self.flush()
+        if self._owned:
+            try:
+                await asyncio.to_thread(self._release, set(self._owned))
+            except Exception as e:
+                logger.error(f"Failed to release workflow leases: {e}")
+
+    def save(self, workflow_id: str, snapshot: Snapshot):
+        """Mark a workflow dirty; snapshot() is called at the next flush to serialize its latest state"""
+        self._dirty[workflow_id] = snapshot
+        self.saves += 1
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.lease_seconds / 3)
+                if not self._stopping:
+                    # Let more transitions accumulate into the same commit
+                    await asyncio.sleep(self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Workflow state flush crashed: {e}")
+
+    async def flush(self):
+        """Write every dirty workflow in one transaction and renew this process's leases"""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        # One flush at a time, so an older snapshot never commits after a newer one
+        async with self._lock:
+            await self._flush()
+
+    async def _flush(self):
+        renew = datetime.utcnow() - self._lease_renewed > timedelta(seconds=self.lease_seconds / 3)
+        if not self._dirty and not (renew and self._owned):
+            return
+
+        dirty, self._dirty = self._dirty, {}
+        snapshots = {}
+        for workflow_id, snapshot in dirty.items():
+            try:
+                snapshots[workflow_id] = snapshot()
+            except Exception as e:
+                # A workflow that cannot be serialized must not hold up everyone else's writes
+                self.errors += 1
+                logger.error(f"Could not serialize workflow {workflow_id}, skipping it: {e}")
+        for workflow_id, data in snapshots.items():
+            if data["status"] in UNFINISHED_STATUSES:
+                self._owned.add(workflow_id)
+            else:
+                self._owned.discard(workflow_id)
+
+        try:
+            lost = await asyncio.to_thread(self._write, snapshots, set(self._owned) if renew else set())
+        except Exception as e:
+            # Keep the snapshots for the next flush unless the workflow changed again meanwhile
+            for workflow_id, snapshot in dirty.items():
+                self._dirty.setdefault(workflow_id, snapshot)
+            self.errors += 1
+            if not self._failing:
+                logger.error(f"Workflow state flush failed, will retry: {e}")
+            self._failing = True
+            return
+
+        self._failing = False
+        self.flushes += 1
+        self.rows_written += len(snapshots) - len(lost & set(snapshots))
+        if renew:
+            self._lease_renewed = datetime.utcnow()
+
+        for workflow_id in lost:
+            self._owned.discard(workflow_id)
+            self.leases_lost += 1
+            logger.warning(f"Workflow {workflow_id} was taken over by another process; stopping it here")
+            if self.on_lease_lost is not None:
+                self.on_lease_lost(workflow_id)
+
+    def _write(self, snapshots: Dict[str, Dict[str, Any]], renew: Set[str]) -> Set[str]:
+        """Upsert snapshots and renew leases; returns the workflows now owned by another process"""
+        now = datetime.utcnow()
+        lease_expires_at = now + timedelta(seconds=self.lease_seconds)
+        ours = or_(WorkflowRecord.owner == self.owner, WorkflowRecord.owner.is_(None))
+        lost: Set[str] = set()
+        db = SessionLocal()
+        try:
+            existing = set()
+            if snapshots:
+                existing = {
+                    workflow_id for (workflow_id,) in
+                    db.query(WorkflowRecord.workflow_id).filter(WorkflowRecord.workflow_id.in_(list(snapshots)))
+                }
+            for workflow_id, data in snapshots.items():
+                unfinished = data["status"] in UNFINISHED_STATUSES
+                values = {
+                    "template": data.get("template"),
+                    "status": data["status"],
+                    "state": data,
+                    "updated_at": now,
+                    "owner": self.owner if unfinished else None,
+                    "lease_expires_at": lease_expires_at if unfinished else None
+                }
+                if workflow_id not in existing:
+                    db.add(WorkflowRecord(workflow_id=workflow_id, created_at=now, **values))
+                    continue
+                # Compare-and-set, so a workflow another process has claimed is never taken back
+                updated = db.query(WorkflowRecord).filter(WorkflowRecord.workflow_id == workflow_id, ours).update(
+                    {getattr(WorkflowRecord, column): value for column, value in values.items()},
+                    synchronize_session=False
+                )
+                if not updated:
+                    lost.add(workflow_id)
+
+            renew_only = list(renew - set(snapshots))
+            if renew_only:
+                db.query(WorkflowRecord).filter(
+                    WorkflowRecord.workflow_id.in_(renew_only),
+                    WorkflowRecord.owner == self.owner
+                ).update({WorkflowRecord.lease_expires_at: lease_expires_at}, synchronize_session=False)
+                lost.update(
+                    workflow_id for (workflow_id,) in db.query(WorkflowRecord.workflow_id).filter(
+                        WorkflowRecord.workflow_id.in_(renew_only),
+                        WorkflowRecord.owner.isnot(None),
+                        WorkflowRecord.owner != self.owner
+                    )
+                )
+            db.commit()
+            return lost
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _release(self, workflow_ids: Set[str]):
+        db = SessionLocal()
+        try:
+            db.query(WorkflowRecord).filter(
+                WorkflowRecord.workflow_id.in_(list(workflow_ids)),
+                WorkflowRecord.owner == self.owner
+            ).update({WorkflowRecord.owner: None, WorkflowRecord.lease_expires_at: None}, synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+    async def claim_unfinished(self) -> List[Dict[str, Any]]:
+        """Take over unfinished workflows that no live process holds; returns their saved states"""
+        claimed = await asyncio.to_thread(self._claim_unfinished)
+        self._owned.update(data["workflow_id"] for data in claimed)
+        return claimed
+
+    def _claim_unfinished(self) -> List[Dict[str, Any]]:
+        now = datetime.utcnow()
+        db = SessionLocal()
+        try:
+            unclaimed = or_(WorkflowRecord.owner.is_(None), WorkflowRecord.lease_expires_at < now)
+            candidates = [
+                workflow_id for (workflow_id,) in db.query(WorkflowRecord.workflow_id).filter(
+                    WorkflowRecord.status.in_(UNFINISHED_STATUSES), unclaimed
+                )
+            ]
+
+            # Compare-and-set per workflow, so workers starting together never claim the same one
+            claimed_ids = []
+            for workflow_id in candidates:
+                taken = db.query(WorkflowRecord).filter(WorkflowRecord.workflow_id == workflow_id, unclaimed).update(
+                    {
+                        WorkflowRecord.owner: self.owner,
+                        WorkflowRecord.lease_expires_at: now + timedelta(seconds=self.lease_seconds)
+                    },
+                    synchronize_session=False
+                )
+                db.commit()
+                if taken:
+                    claimed_ids.append(workflow_id)
+
+            if not claimed_ids:
+                return []
+            return [
+                record.state
+                for record in db.query(WorkflowRecord).filter(WorkflowRecord.workflow_id.in_(claimed_ids))
+            ]
+        finally:
+            db.close()
+
+    async def load(self, workflow_id: str) -> Optional[Dict[str, Any]]:
+        """Saved state of a workflow, e.g. one run by another worker"""
+        return await asyncio.to_thread(self._load, workflow_id)
+
+    def _load(self, workflow_id: str) -> Optional[Dict[str, Any]]:
+        db = SessionLocal()
+        try:
+            record = db.get(WorkflowRecord, workflow_id)
+            return record.state if record is not None else None
+        finally:
+            db.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "owner": self.owner,
+            "flush_interval_ms": int(self.flush_interval * 1000),
+            "dirty": len(self._dirty),
+            "owned": len(self._owned),
+            "saves": self.saves,
+            "flushes": self.flushes,
+            "rows_written": self.rows_written,
+            "errors": self.errors,
+            "leases_lost": self.leases_lost
+        }
+
+
+# Global store instance
+workflow_store = WorkflowStore()
@@ -11,12 +11,14 @@ from typing import Dict, Any, Optional
 
 from fastapi import FastAPI, HTTPException, Depends, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, PlainTextResponse
 import uvicorn
 
 # Import our custom modules
 from core.mcp_manager import mcp_manager
 from core.database import init_db
+from core.workflow_executor import workflow_executor
+from core.workflow_store import workflow_store
 from agents.base_agent import BaseAgent, TaskContext, AgentResponse
 from agents.business_formation_agent import BusinessFormationAgent
 from agents.content_strategy_agent import ContentStrategyAgent
@@ -39,13 +41,15 @@ async def lifespan(app: FastAPI):
     # Initialize Database
     try:
         init_db()
+        workflow_store.start()
         logger.info("Database initialized successfully")
     except Exception as e:
         logger.error(f"Failed to initialize database: {e}")
 
     # Initialize MCP Manager
     try:
-        connection_results = await mcp_manager.connect_all()
+        mcp_manager.start_background_tasks()
+        connection_results = await mcp_manager.ensure_connected()
         logger.info(f"MCP Manager initialized. Connection results: {connection_results}")
     except Exception as e:
         logger.error(f"Failed to initialize MCP Manager: {e}")
@@ -58,6 +62,9 @@ async def lifespan(app: FastAPI):
         agents["startup_orchestrator"] = orchestrator
         logger.info("Startup Formation Orchestrator initialized successfully")
 
+        # Pick up workflows interrupted by a restart or left by a dead worker
+        await orchestrator.recover_workflows()
+
         # Business Formation Agent
         business_agent = BusinessFormationAgent(mcp_manager)
         await business_agent.initialize()
@@ -84,6 +91,24 @@ async def lifespan(app: FastAPI):
     # Shutdown
     logger.info("Shutting down Yogabrata AI Platform...")
 
+    # Let admitted workflows finish (up to WORKFLOW_DRAIN_TIMEOUT) before their MCP connections go away
+    try:
+        await workflow_executor.drain()
+    except Exception as e:
+        logger.error(f"Failed to drain workflows: {e}")
+
+    # Write out buffered workflow state and hand unfinished workflows' leases back
+    try:
+        await workflow_store.stop()
+    except Exception as e:
+        logger.error(f"Failed to flush workflow state: {e}")
+
+    # Release pooled MCP HTTP connections
+    try:
+        await mcp_manager.close_all()
+    except Exception as e:
+        logger.error(f"Failed to close MCP connections: {e}")
+
 # Create FastAPI app with lifespan management
 app = FastAPI(
     title="Yogabrata AI Platform API",
@@ -181,6 +206,9 @@ async def root():
             <div class="endpoint">
                 <strong>GET /api/v2/mcp/status</strong> - MCP server connection status
             </div>
+            <div class="endpoint">
+                <strong>GET /metrics</strong> - MCP latency and throughput metrics (Prometheus format)
+            </div>
 
             <h3>🚀 Startup Formation Endpoints</h3>
             <div class="endpoint">
@@ -256,10 +284,28 @@ async def get_mcp_status():
     return {
         "mcp_manager": {
             "total_servers": len(mcp_manager.connections),
-            "server_status": mcp_manager.get_server_status()
+            "server_status": mcp_manager.get_server_status(),
+            "cache": mcp_manager.get_cache_stats(),
+            "coalescing": mcp_manager.get_coalescing_stats(),
+            "runtime": mcp_manager.get_runtime_stats()
         }
     }
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """MCP latency histograms and counters in the Prometheus text format"""
+    return mcp_manager.get_prometheus_metrics()
+
+@app.post("/api/v2/mcp/reconnect")
+async def reconnect_mcp_servers(request: Optional[Dict[str, Any]] = None):
+    """Re-probe MCP server connections (all servers, or those listed in "servers")"""
+    server_names = (request or {}).get("servers")
+    results = await mcp_manager.reconnect(server_names)
+    return {
+        "connection_results": results,
+        "timestamp": asyncio.get_event_loop().time()
+    }
+
 @app.get("/api/v2/agents")
 async def list_agents():
     """List all available AI agents"""
@@ -351,6 +397,12 @@ async def create_startup_workflow(request: Dict[str, Any]):
     orchestrator = agents["startup_orchestrator"]
     response = await orchestrator.execute_task(task, context)
 
+    # Backpressure: every workflow worker is busy and the admission queue is full
+    if response.data.get("error") == "workflow_queue_full":
+        raise HTTPException(status_code=429, detail=response.message)
+    if response.data.get("error") == "shutting_down":
+        raise HTTPException(status_code=503, detail=response.message)
+
     return {
         "success": response.success,
         "message": response.message,
@@ -371,6 +423,8 @@ async def list_startup_workflows():
     return {
         "workflows": workflows,
         "total_count": len(workflows),
+        "executor": workflow_executor.get_stats(),
+        "persistence": workflow_store.get_stats(),
         "timestamp": asyncio.get_event_loop().time()
     }
 
@@ -381,7 +435,7 @@ async def get_workflow_status(workflow_id: str):
         raise HTTPException(status_code=503, detail="Startup Formation Orchestrator not available")
 
     orchestrator = agents["startup_orchestrator"]
-    workflow_summary = orchestrator.get_workflow_summary(workflow_id)
+    workflow_summary = await orchestrator.find_workflow_summary(workflow_id)
 
     if not workflow_summary:
         raise HTTPException(status_code=404, detail=f"Workflow '{workflow_id}' not found")
@@ -0,0 +1,42 @@
+"""
+Tests for agent availability reporting
+"""
+
+import asyncio
+
+from agents.content_strategy_agent import ContentStrategyAgent
+from agents.legal_compliance_agent import LegalComplianceAgent
+from core.mcp_manager import MCPManager
+
+
+def _initialize(agent_class, slow_server: str):
+    manager = MCPManager()
+    for connection in manager.connections.values():
+        connection.connected = connection.config.name != slow_server
+
+    async def ensure_connected():
+        return manager.get_connection_results()
+
+    manager.ensure_connected = ensure_connected
+    agent = agent_class(manager)
+    asyncio.run(agent.initialize())
+    return manager, agent
+
+
+def test_agent_becomes_active_when_slow_server_connects_later():
+    for agent_class, slow_server in ((ContentStrategyAgent, "grants_gov"), (LegalComplianceAgent, "legal_us")):
+        manager, agent = _initialize(agent_class, slow_server)
+        assert not agent.is_active
+        assert not agent.get_status()["is_active"]
+
+        # The background probe finishes after the connect deadline
+        manager.connections[slow_server].connected = True
+
+        assert agent.is_active
+        assert agent.get_status()["is_active"]
+
+
+def test_agent_is_inactive_before_initialization():
+    agent = LegalComplianceAgent(MCPManager())
+
+    assert not agent.is_active
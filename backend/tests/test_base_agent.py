@@ -0,0 +1,39 @@
+"""
+Tests for concurrent MCP lookups in agents
+"""
+
+import asyncio
+
+import pytest
+
+from agents.business_formation_agent import BusinessFormationAgent
+from core.mcp_manager import MCPManager
+
+
+def test_late_lookups_are_reported_as_timed_out():
+    manager = MCPManager()
+
+    async def fast(*args, **kwargs):
+        return {"requirements": ["UBI number"]}
+
+    async def slow(*args, **kwargs):
+        await asyncio.sleep(5)
+
+    manager.connections["wa_sos"].query = fast
+    manager.connections["wa_dor"].query = slow
+    agent = BusinessFormationAgent(manager)
+
+    results = asyncio.run(agent.gather_mcp_lookups(
+        {"wa_sos": "registration requirements", "wa_dor": "tax requirements"}, deadline=0.1
+    ))
+
+    assert results["wa_sos"] == {"requirements": ["UBI number"]}
+    assert results["wa_dor"]["timed_out"]
+    assert agent.answered_sources(results) == ["wa_sos"]
+
+
+def test_transactional_servers_are_rejected():
+    agent = BusinessFormationAgent(MCPManager())
+
+    with pytest.raises(ValueError):
+        asyncio.run(agent.gather_mcp_lookups({"irs_ein": "Execute Obtain EIN for Sample Tech LLC"}))
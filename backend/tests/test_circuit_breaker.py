@@ -0,0 +1,102 @@
+"""
+Tests for the MCP circuit breaker
+"""
+
+import asyncio
+
+from core.circuit_breaker import CircuitBreaker, CircuitState
+from core.mcp_manager import MCPManager
+
+
+def _cool_down(breaker: CircuitBreaker):
+    breaker._opened_at -= breaker.open_seconds
+
+
+def _open(breaker: CircuitBreaker):
+    for _ in range(breaker.min_requests):
+        breaker.allow_request()
+        breaker.record_failure()
+
+
+def test_opens_once_failure_rate_crosses_threshold():
+    breaker = CircuitBreaker(failure_rate_threshold=0.5, min_requests=4)
+    for succeeded in (True, True, False):
+        assert breaker.allow_request()
+        breaker.record_success() if succeeded else breaker.record_failure()
+    assert breaker.state == CircuitState.CLOSED
+
+    breaker.allow_request()
+    breaker.record_failure()
+
+    assert breaker.state == CircuitState.OPEN
+    assert not breaker.allow_request()
+    assert breaker.rejected_requests == 1
+
+
+def test_half_open_probe_success_closes():
+    breaker = CircuitBreaker(min_requests=2)
+    _open(breaker)
+    _cool_down(breaker)
+
+    assert breaker.get_status()["state"] == "half_open"
+    assert breaker.allow_request()
+    assert breaker.state == CircuitState.HALF_OPEN
+    # Only one probe at a time
+    assert not breaker.allow_request()
+
+    breaker.record_success()
+
+    assert breaker.state == CircuitState.CLOSED
+    assert breaker.failure_rate == 0.0
+    assert breaker.allow_request()
+
+
+def test_half_open_probe_failure_reopens():
+    breaker = CircuitBreaker(min_requests=2)
+    _open(breaker)
+    _cool_down(breaker)
+
+    assert breaker.allow_request()
+    breaker.record_failure()
+
+    assert breaker.state == CircuitState.OPEN
+    assert breaker.times_opened == 2
+    assert not breaker.allow_request()
+
+
+def test_released_probe_slot_allows_next_probe():
+    breaker = CircuitBreaker(min_requests=2)
+    _open(breaker)
+    _cool_down(breaker)
+
+    assert breaker.allow_request()
+    breaker.release()
+
+    assert breaker.allow_request()
+
+
+def test_cancelled_probe_does_not_leave_circuit_half_open():
+    manager = MCPManager()
+    connection = manager.connections["irs_ein"]
+    breaker = connection.circuit_breaker
+    _open(breaker)
+    _cool_down(breaker)
+
+    async def hang(*args, **kwargs):
+        await asyncio.sleep(60)
+
+    async def answer(*args, **kwargs):
+        return {"ein": "12-3456789"}
+
+    async def run():
+        connection.query = hang
+        probe = asyncio.create_task(manager.query_server("irs_ein", "Execute Obtain EIN for Sample Tech LLC"))
+        await asyncio.sleep(0.01)
+        probe.cancel()
+        await asyncio.gather(probe, return_exceptions=True)
+
+        connection.query = answer
+        return await manager.query_server("irs_ein", "Execute Obtain EIN for Sample Tech LLC")
+
+    assert asyncio.run(run()) == {"ein": "12-3456789"}
+    assert breaker.state == CircuitState.CLOSED
@@ -0,0 +1,62 @@
+"""
+Tests for the single-pass keyword intent router
+"""
+
+import pytest
+
+from agents.business_formation_agent import INTENT_ROUTER
+from agents.intent_router import IntentRouter, normalize_text
+from benchmarks.intent_router_benchmark import legacy_read, make_task
+
+TASKS = [
+    "I want to register a new business in Washington",
+    "How do I incorporate my startup?",
+    "Which license or permit do I need for a restaurant in Seattle?",
+    "What taxes does a software company pay? Do I need an EIN?",
+    "Federal tax obligations for a consulting LLC",
+    "Should we be a corporation or a partnership? We have multiple owners",
+    "Compliance requirements for a healthcare practice with high risk procedures",
+    "We plan to scale and expand a manufacturing business with partners",
+    "Tell me about real estate professional services regulations",
+    "Nonprofit 501c3 structure questions",
+    "Limited liability company for retail, we want to grow",
+    "Hello, what can you do?",
+    "",
+]
+
+
+@pytest.mark.parametrize("task", TASKS + [make_task(words, seed) for words in (20, 200) for seed in range(3)])
+def test_classify_matches_legacy_keyword_scans(task):
+    assert INTENT_ROUTER.classify(task) == legacy_read(task)
+
+
+def test_keywords_only_match_at_word_starts():
+    # The old substring scans read "being" as "ein" and "platform" as "form"
+    result = INTENT_ROUTER.classify("We are being asked to pick a platform")
+
+    assert result["route"] == "general"
+    assert legacy_read("We are being asked to pick a platform")["route"] == "registration"
+
+
+def test_longest_keyword_implies_its_prefixes():
+    router = IntentRouter({"topic": [("tax", ["tax"]), ("federal", ["federal tax"])]})
+
+    assert router.keywords("Federal taxes due") == {"tax", "federal tax"}
+    assert router.classify("Federal taxes due") == {"topic": "tax"}
+
+
+def test_punctuation_and_spacing_are_word_separators():
+    router = IntentRouter({"business_type": [("Nonprofit", ["non profit"])]}, defaults={"business_type": "LLC"})
+
+    assert router.classify("A non-profit org") == {"business_type": "Nonprofit"}
+    assert router.classify("A non   profit org") == {"business_type": "Nonprofit"}
+    assert router.classify("A nonprofit org") == {"business_type": "LLC"}
+    assert normalize_text("Non-Profit, Inc.") == " non profit  inc "
+
+
+def test_first_matching_label_wins():
+    router = IntentRouter({"route": [("registration", ["form"]), ("tax", ["tax"])]}, defaults={"route": "general"})
+
+    assert router.classify("tax forms") == {"route": "registration"}
+    assert router.classify("tax") == {"route": "tax"}
+    assert router.classify("nothing here") == {"route": "general"}
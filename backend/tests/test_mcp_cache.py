@@ -0,0 +1,105 @@
+"""
+Tests for MCP response caching and stale fallback
+"""
+
+import asyncio
+import time
+
+from core.mcp_cache import ResponseCache, make_cache_key
+from core.mcp_manager import MCPManager
+
+
+def _expire(cache: ResponseCache, key):
+    cache._entries[key].expires_at = time.monotonic() - 1
+
+
+def test_error_keeps_last_good_response_for_stale_reads():
+    cache = ResponseCache()
+    key = make_cache_key("wa_dor", "sales tax rates")
+    cache.set(key, {"rate": 6.5}, ttl=60)
+    _expire(cache, key)
+
+    cache.set(key, {"error": "upstream down"}, ttl=30, is_error=True)
+
+    assert cache.get(key) == {"error": "upstream down"}
+    assert cache.get_stale(key) == {"rate": 6.5}
+
+    # A second failure still remembers the last success
+    cache.set(key, {"error": "still down"}, ttl=30, is_error=True)
+    assert cache.get_stale(key) == {"rate": 6.5}
+
+
+def test_error_does_not_replace_fresh_response():
+    cache = ResponseCache()
+    key = make_cache_key("wa_dor", "sales tax rates")
+    cache.set(key, {"rate": 6.5}, ttl=60)
+
+    cache.set(key, {"error": "refresh failed"}, ttl=30, is_error=True)
+
+    assert cache.get(key) == {"rate": 6.5}
+
+
+def test_stale_response_served_when_upstream_fails_after_expiry():
+    manager = MCPManager()
+    connection = manager.connections["wa_dor"]
+    answers = [{"rate": 6.5}, {"error": "HTTP 503"}]
+
+    async def query(*args, **kwargs):
+        return answers.pop(0)
+
+    connection.query = query
+
+    async def run():
+        first = await manager.query_server("wa_dor", "sales tax rates")
+        _expire(manager.cache, make_cache_key("wa_dor", "sales tax rates"))
+        second = await manager.query_server("wa_dor", "sales tax rates")
+        return first, second
+
+    first, second = asyncio.run(run())
+
+    assert first == {"rate": 6.5}
+    assert second == {"rate": 6.5, "stale": True}
+
+
+def test_transactional_queries_are_not_coalesced():
+    manager = MCPManager()
+    calls = []
+
+    async def query(*args, **kwargs):
+        calls.append(args)
+        filing = len(calls)
+        await asyncio.sleep(0.01)
+        return {"ein": f"12-345678{filing}"}
+
+    manager.connections["irs_ein"].query = query
+    manager.connections["wa_dor"].query = query
+
+    async def run(server_name):
+        return await asyncio.gather(*(
+            manager.query_server(server_name, "Execute Obtain EIN for Sample Tech LLC") for _ in range(3)
+        ))
+
+    filings = asyncio.run(run("irs_ein"))
+    assert len(calls) == 3
+    assert len({result["ein"] for result in filings}) == 3
+
+    calls.clear()
+    asyncio.run(run("wa_dor"))
+    assert len(calls) == 1
+
+    # A failed filing is not negative-cached: the retry reaches the upstream again
+    answers = [{"error": "HTTP 503"}, {"ein": "12-3456789"}]
+
+    async def flaky(*args, **kwargs):
+        calls.append(args)
+        return answers.pop(0)
+
+    async def retry():
+        await manager.query_server("irs_ein", "Execute Obtain EIN for Sample Tech LLC")
+        return await manager.query_server("irs_ein", "Execute Obtain EIN for Sample Tech LLC")
+
+    calls.clear()
+    manager.connections["irs_ein"].query = flaky
+    assert asyncio.run(retry()) == {"ein": "12-3456789"}
+    assert len(calls) == 2
+
@@ -0,0 +1,63 @@
+"""
+Tests for refresh-ahead prefetching
+"""
+
+import asyncio
+import time
+
+from core.mcp_cache import make_cache_key
+from core.mcp_manager import MCPManager
+
+
+def _due_refreshes(manager: MCPManager):
+    refreshed = []
+
+    async def refresh(key, *request):
+        refreshed.append(key)
+        return {}
+
+    manager.refresh = refresh
+
+    async def run():
+        manager.prefetcher.refresh_due()
+        await asyncio.gather(*manager.prefetcher._refreshing)
+
+    asyncio.run(run())
+    return refreshed
+
+
+def _cache_expiring(manager: MCPManager, query: str, remaining: float):
+    key = make_cache_key("wa_dor", query)
+    manager.cache.set(key, {"rate": 6.5}, ttl=60)
+    manager.cache._entries[key].expires_at = time.monotonic() + remaining
+    return key
+
+
+def test_hot_entry_close_to_expiry_is_refreshed():
+    manager = MCPManager()
+    key = _cache_expiring(manager, "sales tax rates", remaining=5)
+    manager.prefetcher.record(key, "wa_dor", "sales tax rates")
+
+    assert _due_refreshes(manager) == [key]
+
+
+def test_entry_without_recent_requests_is_forgotten():
+    manager = MCPManager()
+    prefetcher = manager.prefetcher
+    key = _cache_expiring(manager, "sales tax rates", remaining=5)
+    prefetcher.record(key, "wa_dor", "sales tax rates")
+
+    # Last requested three half-lives ago
+    score, updated, request = prefetcher._popularity[key]
+    prefetcher._popularity[key] = (score, updated - 3 * 600.0, request)
+
+    assert _due_refreshes(manager) == []
+    assert key not in prefetcher._popularity
+
+
+def test_entry_expired_long_ago_is_not_refreshed():
+    manager = MCPManager()
+    key = _cache_expiring(manager, "sales tax rates", remaining=-600)
+    manager.prefetcher.record(key, "wa_dor", "sales tax rates")
+
+    assert _due_refreshes(manager) == []
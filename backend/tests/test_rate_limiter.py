@@ -0,0 +1,113 @@
+"""
+Tests for the priority-aware token bucket
+"""
+
+import asyncio
+
+from core.rate_limiter import PRIORITY_BACKGROUND, PRIORITY_INTERACTIVE, TokenBucket
+
+
+def test_try_acquire_takes_only_free_tokens():
+    bucket = TokenBucket(rate_per_minute=1, burst_size=2)
+
+    assert bucket.try_acquire()
+    assert bucket.try_acquire()
+    assert not bucket.try_acquire()
+
+
+def test_try_acquire_never_jumps_the_queue():
+    bucket = TokenBucket(rate_per_minute=1, burst_size=1)
+
+    async def run():
+        bucket.try_acquire()
+        waiter = asyncio.create_task(bucket.acquire())
+        await asyncio.sleep(0)
+        # A token frees up, but a caller is already waiting for it
+        bucket._tokens = 1.0
+        taken = bucket.try_acquire()
+        waiter.cancel()
+        return taken
+
+    assert not asyncio.run(run())
+
+
+def test_queued_priorities_share_tokens_by_weight():
+    bucket = TokenBucket(rate_per_minute=60 * 500, burst_size=1)
+    granted = []
+
+    async def request(label: str, priority: int):
+        await bucket.acquire(priority=priority, user_id=label)
+        granted.append(label)
+
+    async def run():
+        bucket.try_acquire()
+        await asyncio.gather(*(
+            request(label, priority)
+            for label, priority in [("interactive", PRIORITY_INTERACTIVE)] * 20 + [("background", PRIORITY_BACKGROUND)] * 20
+        ))
+
+    asyncio.run(run())
+
+    # Interactive has 8 times the weight of background while both are queued
+    first = granted[:18]
+    assert first.count("interactive") == 16
+    assert first.count("background") == 2
+    assert len(granted) == 40
+
+
+def test_users_of_one_priority_take_turns():
+    bucket = TokenBucket(rate_per_minute=60 * 500, burst_size=1)
+    granted = []
+
+    async def request(user_id: str):
+        await bucket.acquire(user_id=user_id)
+        granted.append(user_id)
+
+    async def run():
+        bucket.try_acquire()
+        await asyncio.gather(*(request(user_id) for user_id in ["alice", "alice", "alice", "bob"]))
+
+    asyncio.run(run())
+
+    assert granted == ["alice", "bob", "alice", "alice"]
+
+
+def test_token_granted_to_cancelled_caller_is_handed_to_next_waiter():
+    bucket = TokenBucket(rate_per_minute=1, burst_size=1)
+
+    async def run():
+        bucket.try_acquire()
+        first = asyncio.create_task(bucket.acquire())
+        second = asyncio.create_task(bucket.acquire())
+        await asyncio.sleep(0)
+
+        # One token arrives and goes to the first caller, who gives up before resuming
+        bucket._tokens = 1.0
+        bucket._dispatch()
+        first.cancel()
+
+        await asyncio.gather(first, return_exceptions=True)
+        # The next token would take a minute; the second caller must get the handed-over one
+        await asyncio.wait_for(second, timeout=1)
+        return first.cancelled()
+
+    assert asyncio.run(run())
+
+
+def test_cancelled_waiter_is_skipped():
+    bucket = TokenBucket(rate_per_minute=1, burst_size=1)
+
+    async def run():
+        bucket.try_acquire()
+        first = asyncio.create_task(bucket.acquire())
+        second = asyncio.create_task(bucket.acquire())
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.gather(first, return_exceptions=True)
+
+        bucket._tokens = 1.0
+        bucket._dispatch()
+        await asyncio.wait_for(second, timeout=1)
+        return bucket.queue_depth
+
+    assert asyncio.run(run()) == 0
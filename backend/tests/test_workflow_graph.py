@@ -0,0 +1,73 @@
+"""
+Tests for workflow dependency graphs
+"""
+
+import pytest
+
+from agents.startup_formation_orchestrator import StartupFormationOrchestrator
+from agents.workflow_graph import ReadyTracker, WorkflowGraph
+from core.mcp_manager import MCPManager
+
+DIAMOND = [
+    ("analyze", []),
+    ("name_check", ["analyze"]),
+    ("ein", ["analyze"]),
+    ("register", ["name_check", "ein"])
+]
+
+
+def test_compile_orders_steps_topologically():
+    graph = WorkflowGraph.compile(DIAMOND)
+
+    assert graph.order == ("analyze", "name_check", "ein", "register")
+    assert graph.roots == ["analyze"]
+    assert graph.dependents["analyze"] == ("name_check", "ein")
+    assert graph.in_degree["register"] == 2
+
+
+def test_compile_rejects_cycles():
+    with pytest.raises(ValueError, match="cycle"):
+        WorkflowGraph.compile([
+            ("analyze", []),
+            ("name_check", ["analyze", "register"]),
+            ("register", ["name_check"])
+        ])
+
+
+def test_compile_rejects_self_dependency():
+    with pytest.raises(ValueError, match="cycle"):
+        WorkflowGraph.compile([("analyze", ["analyze"])])
+
+
+def test_compile_rejects_unknown_dependencies():
+    with pytest.raises(ValueError, match="unknown steps: \\['bank_account'\\]"):
+        WorkflowGraph.compile([("analyze", []), ("payroll", ["analyze", "bank_account"])])
+
+
+def test_compile_rejects_duplicate_steps():
+    with pytest.raises(ValueError, match="Duplicate"):
+        WorkflowGraph.compile([("analyze", []), ("analyze", [])])
+
+
+def test_ready_tracker_unblocks_step_once_all_dependencies_complete():
+    tracker = ReadyTracker(WorkflowGraph.compile(DIAMOND))
+
+    assert tracker.ready() == ["analyze"]
+    assert tracker.complete("analyze") == ["name_check", "ein"]
+    assert tracker.complete("name_check") == []
+    assert tracker.complete("ein") == ["register"]
+    # Completing a step twice unblocks nothing new
+    assert tracker.complete("ein") == []
+
+
+def test_ready_tracker_resumes_from_completed_steps():
+    tracker = ReadyTracker(WorkflowGraph.compile(DIAMOND), completed=["analyze", "ein"])
+
+    assert tracker.ready() == ["name_check"]
+
+
+def test_orchestrator_templates_compile():
+    orchestrator = StartupFormationOrchestrator(MCPManager())
+
+    for template, steps in orchestrator.workflow_templates.items():
+        assert len(orchestrator.workflow_graphs[template].order) == len(steps)
@@ -0,0 +1,113 @@
+"""
+Tests for write-behind workflow persistence and lease ownership
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from agents.startup_formation_orchestrator import StartupFormationOrchestrator
+from core import workflow_store as store_module
+from core.database import Base, WorkflowRecord
+from core.mcp_manager import MCPManager
+from core.workflow_store import WorkflowStore
+
+
+@pytest.fixture
+def sessions(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'workflows.db'}")
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    monkeypatch.setattr(store_module, "SessionLocal", factory)
+    return factory
+
+
+def _state(workflow_id: str, status: str = "in_progress", progress: float = 0.0):
+    return {"workflow_id": workflow_id, "template": "llc", "status": status, "progress_percentage": progress}
+
+
+def _record(sessions, workflow_id: str) -> WorkflowRecord:
+    db = sessions()
+    try:
+        return db.get(WorkflowRecord, workflow_id)
+    finally:
+        db.close()
+
+
+def test_flush_does_not_take_back_a_workflow_claimed_elsewhere(sessions):
+    first, second = WorkflowStore(), WorkflowStore()
+    lost = []
+    first.on_lease_lost = lost.append
+
+    async def run():
+        first.save("wf_1", lambda: _state("wf_1"))
+        await first.flush()
+
+        # The first process's lease lapses (e.g. its flushes failed) and another worker resumes the workflow
+        db = sessions()
+        db.get(WorkflowRecord, "wf_1").lease_expires_at = datetime.utcnow() - timedelta(seconds=1)
+        db.commit()
+        db.close()
+        claimed = await second.claim_unfinished()
+
+        first.save("wf_1", lambda: _state("wf_1", progress=50.0))
+        await first.flush()
+        return claimed
+
+    claimed = asyncio.run(run())
+
+    assert [data["workflow_id"] for data in claimed] == ["wf_1"]
+    assert lost == ["wf_1"]
+    record = _record(sessions, "wf_1")
+    assert record.owner == second.owner
+    assert record.state["progress_percentage"] == 0.0
+
+
+def test_live_lease_blocks_claims(sessions):
+    first, second = WorkflowStore(), WorkflowStore()
+
+    async def run():
+        first.save("wf_1", lambda: _state("wf_1"))
+        await first.flush()
+        blocked = await second.claim_unfinished()
+        await first.stop()
+        released = await second.claim_unfinished()
+        return blocked, released
+
+    blocked, released = asyncio.run(run())
+
+    assert blocked == []
+    assert [data["workflow_id"] for data in released] == ["wf_1"]
+
+
+def test_unserializable_workflow_does_not_block_other_writes(sessions):
+    store = WorkflowStore()
+
+    def broken():
+        raise TypeError("Object of type set is not JSON serializable")
+
+    async def run():
+        store.save("wf_bad", broken)
+        store.save("wf_good", lambda: _state("wf_good"))
+        await store.flush()
+
+    asyncio.run(run())
+
+    assert _record(sessions, "wf_good") is not None
+    assert _record(sessions, "wf_bad") is None
+    assert store.get_stats()["errors"] == 1
+
+
+def test_unreadable_saved_workflow_has_no_summary(sessions):
+    store = WorkflowStore()
+    orchestrator = StartupFormationOrchestrator(MCPManager(), store=store)
+
+    async def run():
+        store.save("wf_1", lambda: _state("wf_1"))
+        await store.flush()
+        return await orchestrator.find_workflow_summary("wf_1")
+
+    assert asyncio.run(run()) is None
@@ -36,7 +36,7 @@ kill_port 3000
 # Start Mock MCP Servers (Port 8001)
 echo "📡 Starting MCP Mock Servers on port 8001..."
 cd backend
-python core/mcp_mock_servers.py &
+python -m core.mcp_mock_servers &
 MOCK_PID=$!
 cd ..
 